@@ -0,0 +1,92 @@
+# /benchmarks/bench_export_formats.py
+"""
+比较各导出格式的文件大小、写出时间与读回时间 (以 GEXF 为基准)。
+SVG 是图片而非数据格式，不参与比较。
+
+用法：python benchmarks/bench_export_formats.py [节点数] [每节点出边数]
+"""
+import csv
+import os
+import sys
+import tempfile
+import time
+
+import networkx as nx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bench_attr_memory import iter_nodes, iter_edges
+from src.binary_graph import BinaryGraph
+from src.core import SkillTreeProject
+from src.exporters import EXPORTERS
+
+
+def read_edgelist(file_path):
+    graph = nx.DiGraph()
+    with open(file_path, 'r', encoding='utf-8', newline='') as f:
+        reader = csv.reader(f, delimiter='\t')
+        columns = next(reader)[2:]
+        for row in reader:
+            graph.add_edge(row[0], row[1], **{key: value for key, value in zip(columns, row[2:]) if value})
+    return graph
+
+
+def read_binary(file_path):
+    with BinaryGraph(file_path) as binary_graph:
+        return binary_graph.to_graph(nx.DiGraph())
+
+
+def open_binary(file_path):
+    """只打开映射并访问边数组，不构建 networkx 图。"""
+    with BinaryGraph(file_path) as binary_graph:
+        return binary_graph.sources[binary_graph.edge_count - 1] if binary_graph.edge_count else None
+
+
+READERS = {
+    'gexf': nx.read_gexf,
+    'graphml': nx.read_graphml,
+    'edgelist': read_edgelist,
+    'binary': read_binary,
+}
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    num_nodes = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    edges_per_node = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        project = SkillTreeProject(tmp_dir)
+        graph = project.new_graph()
+        for node_id, attrs in iter_nodes(num_nodes):
+            graph.add_node(node_id, **attrs)
+        for source, target, attrs in iter_edges(num_nodes, edges_per_node):
+            graph.add_edge(source, target, **attrs)
+        project.graph = graph
+        print(f"图规模: {graph.number_of_nodes()} 个节点, {graph.number_of_edges()} 条边")
+        print(f"{'格式':<10}{'大小 (MB)':>12}{'写出 (s)':>12}{'读回 (s)':>12}{'大小/GEXF':>12}{'读回/GEXF':>12}")
+
+        baseline = None
+        for name, exporter in EXPORTERS.items():
+            if name not in READERS:
+                continue
+            output_file = os.path.join(tmp_dir, 'skill_tree' + exporter.extension)
+            write_seconds, _ = timed(exporter.writer, project, output_file)
+            read_seconds, loaded = timed(READERS[name], output_file)
+            size = os.path.getsize(output_file)
+            if baseline is None:
+                baseline = (size, read_seconds)
+            print(f"{name:<10}{size / 1e6:>12.1f}{write_seconds:>12.2f}{read_seconds:>12.2f}"
+                  f"{size / baseline[0]:>12.2f}{read_seconds / baseline[1]:>12.3f}")
+            assert loaded.number_of_edges() == graph.number_of_edges()
+            if name == 'binary':
+                open_seconds, _ = timed(open_binary, output_file)
+                print(f"{'':<10}binary 仅 mmap 打开并访问边数组: {open_seconds * 1000:.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
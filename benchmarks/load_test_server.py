@@ -0,0 +1,126 @@
+# /benchmarks/load_test_server.py
+"""
+对本地运行中的图服务 (python main.py serve <project>) 进行压力测试，
+报告每秒请求数以及 p50/p99 延迟。
+
+用法：python benchmarks/load_test_server.py [--url http://127.0.0.1:5000] [--duration 10]
+                                           [--concurrency 16] [--write-ratio 0.1]
+注意：写请求会真实写入工程的编辑日志，请在测试用的工程上运行。
+"""
+import argparse
+import http.client
+import json
+import random
+import threading
+import time
+from urllib.parse import urlparse, quote
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class Worker(threading.Thread):
+    """单个客户端：复用一个 HTTP/1.1 长连接，按比例混合读写请求。"""
+    def __init__(self, worker_id, host, port, node_ids, write_ratio, deadline):
+        super().__init__(daemon=True)
+        self.worker_id = worker_id
+        self.host, self.port = host, port
+        self.node_ids = node_ids
+        self.write_ratio = write_ratio
+        self.deadline = deadline
+        self.rng = random.Random(worker_id)
+        self.latencies = {'read': [], 'write': []}
+        self.errors = 0
+
+    def _request(self, conn, method, path, body=None):
+        payload = json.dumps(body).encode('utf-8') if body is not None else None
+        headers = {'Content-Type': 'application/json'} if payload is not None else {}
+        conn.request(method, path, body=payload, headers=headers)
+        response = conn.getresponse()
+        response.read()
+        return response.status
+
+    def _next_request(self, counter):
+        if self.rng.random() < self.write_ratio:
+            new_id = f"loadtest_{self.worker_id}_{counter}"
+            if counter % 2 == 0:
+                return 'write', 'POST', '/api/nodes', {'id': new_id, 'level': 'intermediate'}
+            return 'write', 'POST', '/api/edges', {'source': self.rng.choice(self.node_ids),
+                                                   'target': self.rng.choice(self.node_ids),
+                                                   'type': 'RELATED_TO'}
+        node_id = quote(str(self.rng.choice(self.node_ids)))
+        kind = self.rng.random()
+        if kind < 0.5:
+            return 'read', 'GET', f'/api/neighbors?id={node_id}&direction=both', None
+        if kind < 0.8:
+            return 'read', 'GET', f'/api/node?id={node_id}', None
+        return 'read', 'GET', f'/api/search?q={node_id[:3]}&limit=10', None
+
+    def run(self):
+        conn = http.client.HTTPConnection(self.host, self.port, timeout=30)
+        counter = 0
+        while time.monotonic() < self.deadline:
+            kind, method, path, body = self._next_request(counter)
+            counter += 1
+            start = time.perf_counter()
+            try:
+                status = self._request(conn, method, path, body)
+                if status >= 500:
+                    self.errors += 1
+            except (OSError, http.client.HTTPException):
+                self.errors += 1
+                conn.close()
+                conn = http.client.HTTPConnection(self.host, self.port, timeout=30)
+                continue
+            self.latencies[kind].append(time.perf_counter() - start)
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="图服务压力测试")
+    parser.add_argument('--url', default='http://127.0.0.1:5000')
+    parser.add_argument('--duration', type=float, default=10.0, help='测试时长 (秒)')
+    parser.add_argument('--concurrency', type=int, default=16, help='并发客户端数')
+    parser.add_argument('--write-ratio', type=float, default=0.1, help='写请求比例 (0~1)')
+    args = parser.parse_args()
+
+    parsed = urlparse(args.url)
+    host, port = parsed.hostname, parsed.port or 80
+
+    conn = http.client.HTTPConnection(host, port, timeout=30)
+    conn.request('GET', '/api/search?q=&limit=1000')
+    node_ids = [node['id'] for node in json.loads(conn.getresponse().read())['results']]
+    conn.close()
+    if not node_ids:
+        print("图中没有节点，无法进行测试。")
+        return
+
+    deadline = time.monotonic() + args.duration
+    workers = [Worker(i, host, port, node_ids, args.write_ratio, deadline) for i in range(args.concurrency)]
+    started = time.monotonic()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.monotonic() - started
+
+    print(f"并发数: {args.concurrency}, 时长: {elapsed:.1f}s, 写比例: {args.write_ratio}")
+    print(f"{'kind':<8}{'requests':>10}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    all_latencies = []
+    for kind in ('read', 'write'):
+        latencies = sorted(lat for worker in workers for lat in worker.latencies[kind])
+        all_latencies.extend(latencies)
+        print(f"{kind:<8}{len(latencies):>10}{len(latencies) / elapsed:>10.1f}"
+              f"{percentile(latencies, 0.50) * 1000:>10.2f}{percentile(latencies, 0.99) * 1000:>10.2f}")
+    all_latencies.sort()
+    print(f"{'total':<8}{len(all_latencies):>10}{len(all_latencies) / elapsed:>10.1f}"
+          f"{percentile(all_latencies, 0.50) * 1000:>10.2f}{percentile(all_latencies, 0.99) * 1000:>10.2f}")
+    print(f"错误数: {sum(worker.errors for worker in workers)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,13 +2,17 @@
 import typer
 import os
 import sys
+import json
+import signal
+from contextlib import redirect_stdout
 from pathlib import Path
+from typing import List, Optional
 
 # HTTP服务器相关的导入
-import http.server
 import socketserver
 import threading
 import time # time 仍然可能用于其他地方，或者将来用于更精细的控制
+from concurrent.futures import ProcessPoolExecutor
 from functools import partial
 
 # 从 .app 模块导入 cli_app 实例
@@ -17,8 +21,17 @@ from .app import cli_app
 from settings import config, lang_strings, t
 # 从 src.core 导入核心业务逻辑类
 from src.core import SkillTreeProject
+from web.server import GraphService, ProjectFileRequestHandler, create_server, DEFAULT_BATCH_INTERVAL, DEFAULT_MAX_BATCH
+from src.diff import diff_graphs, format_diff_text, write_diff_html, is_empty_diff
+from src.catalog import ProjectCatalog, scan_project, describe_project, detect_changes, is_stale, sort_entries, SORT_KEYS
+from src.community import DEFAULT_MAX_LEVELS
+from src.exporters import EXPORTERS, get_exporter
+from src.positions import POSITIONS_FILE_NAME
+from src.svg_export import DEFAULT_MAX_EDGES, DEFAULT_MAX_LABELS
+from src.importer import import_edge_lists, parse_column_map, NODE_FIELDS, EDGE_FIELDS, DEFAULT_CHUNK_SIZE
 # 从 .utils 模块导入CLI辅助函数
-from .utils import ensure_projects_dir, list_existing_projects_paths
+from .utils import (ensure_projects_dir, list_existing_projects_paths, is_valid_project_name,
+                    resolve_graph_source, parse_attr_options)
 
 # 全局变量，用于跟踪HTTP服务器线程和状态
 _http_server_thread = None
@@ -90,7 +103,7 @@ def new_project_cmd(
     ensure_projects_dir()
     projects_full_path = Path(config['settings']['projects_directory_full_path'])
 
-    if not project_name or any(c in project_name for c in ['/', '\\', ':', '*', '?', '"', '<', '>', '|', ' ']):
+    if not is_valid_project_name(project_name):
         typer.secho(t('cli.TXT_PROJECT_NAME_INVALID_CHARS') + " (且不允许包含空格)", fg=typer.colors.RED, err=True)
         raise typer.Exit(code=1)
 
@@ -103,23 +116,479 @@ def new_project_cmd(
             project_path.mkdir(parents=True, exist_ok=True)
             with open(project_path / 'graph.yaml', 'w', encoding='utf-8') as f:
                 f.write(DEFAULT_GRAPH_YAML)
+            entry = scan_project(str(project_path), config.get('settings', {}))
+            _project_catalog().update(str(project_path), nodes=entry['nodes'], edges=entry['edges'])
             typer.echo(t('cli.TXT_PROJECT_CREATED', project_name=project_name, project_path=str(project_path)))
             typer.echo(t('cli.TXT_NEW_PROJECT_HINT', project_name=project_name))
         except Exception as e:
             typer.secho(f"{t('cli.TXT_ERROR_CREATING_PROJECT')}: {e}", fg=typer.colors.RED, err=True)
             raise typer.Exit(code=1)
 
+def _project_catalog() -> ProjectCatalog:
+    """返回工程根目录下的工程目录文件 (.catalog.json)。"""
+    return ProjectCatalog(config['settings']['projects_directory_full_path'])
+
+
+def _scan_projects(projects, previous, jobs: Optional[int] = None) -> dict:
+    """
+    扫描给定的工程并生成目录条目。工程之间互不依赖，多于一个工作进程时使用进程池绕开 GIL。
+    单个工程扫描失败只给出警告并跳过，不影响其余工程。
+    :return: {工程名: 条目}。
+    """
+    settings = config.get('settings', {})
+    jobs = max(1, min(jobs or os.cpu_count() or 1, len(projects) or 1))
+
+    def report_failure(project_path, e):
+        typer.secho(t('cli.TXT_REINDEX_PROJECT_FAILED', project_name=project_path.name, error_message=str(e)),
+                    fg=typer.colors.YELLOW, err=True)
+
+    entries = {}
+    if jobs == 1:
+        for project_path in projects:
+            try:
+                entries[project_path.name] = scan_project(str(project_path), settings, previous.get(project_path.name))
+            except Exception as e:
+                report_failure(project_path, e)
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            futures = {p: executor.submit(scan_project, str(p), settings, previous.get(p.name)) for p in projects}
+            for project_path, future in futures.items():
+                try:
+                    entries[project_path.name] = future.result()
+                except Exception as e:
+                    report_failure(project_path, e)
+    return entries
+
+
+def _reindex_projects(jobs: Optional[int] = None) -> int:
+    """
+    并行扫描所有工程并整体重建工程目录。
+    :return: 已索引的工程数。
+    """
+    catalog = _project_catalog()
+    entries = _scan_projects(list_existing_projects_paths(), catalog.load(), jobs)
+    catalog.replace(entries)
+    return len(entries)
+
+
 @cli_app.command(name="list", help=t('cli.TXT_LIST_COMMAND_HELP'))
-def list_projects_cmd():
-    """列出所有可用的技能树工程。"""
+def list_projects_cmd(
+    sort: str = typer.Option("name", "--sort", help=t('cli.TXT_LIST_SORT_HELP')),
+    stale: bool = typer.Option(False, "--stale", help=t('cli.TXT_LIST_STALE_HELP'))
+):
+    """列出所有可用的技能树工程，节点/边数等信息来自工程目录文件。"""
+    if sort not in SORT_KEYS:
+        typer.secho(t('cli.TXT_LIST_INVALID_SORT', sort=sort, choices=", ".join(SORT_KEYS)), fg=typer.colors.RED, err=True)
+        raise typer.Exit(code=1)
+
     projects = list_existing_projects_paths()
     if not projects:
         typer.echo(t('cli.TXT_NO_AVAILABLE_PROJECTS'))
         return
 
+    catalog = _project_catalog()
+    rebuilt = not catalog.exists()
+    if rebuilt:
+        typer.echo(t('cli.TXT_CATALOG_BUILDING'))
+        _reindex_projects()
+    entries = catalog.load()
+    # 目录文件中还没有的工程 (例如在目录文件创建之后才新建或手动复制进来的) 先扫描并加入目录；
+    # 扫描失败的工程仍然列出，但没有统计信息
+    unindexed = [] if rebuilt else [p for p in projects if p.name not in entries]
+    if unindexed:
+        typer.echo(t('cli.TXT_CATALOG_INDEXING_NEW', count=len(unindexed)))
+        new_entries = _scan_projects(unindexed, entries)
+        if new_entries:
+            catalog.merge(new_entries)
+            entries.update(new_entries)
+    # 目录中的条目可能已与磁盘不符 (手动编辑 graph.yaml、删除产物等)：逐个 stat 核对，
+    # graph.yaml 变了的重新扫描，其余只刷新时间戳
+    changed = {p.name: detect_changes(str(p), entries[p.name]) for p in projects if p.name in entries}
+    refreshed = _scan_projects([p for p in projects if changed.get(p.name) == 'graph'], entries)
+    refreshed.update((p.name, describe_project(str(p), entries[p.name]))
+                     for p in projects if changed.get(p.name) == 'files')
+    if refreshed:
+        catalog.merge(refreshed)
+        entries.update(refreshed)
+    rows = [entries.get(p.name) or {'name': p.name, 'unindexed': True} for p in projects]
+    if stale:
+        rows = [row for row in rows if row.get('unindexed') or is_stale(row)]
+        if not rows:
+            typer.echo(t('cli.TXT_NO_STALE_PROJECTS'))
+            return
+
     typer.echo(t('cli.TXT_AVAILABLE_PROJECTS'))
-    for i, project_path_obj in enumerate(projects):
-        typer.echo(f"{i + 1}. {project_path_obj.name}")
+    for i, row in enumerate(sort_entries(rows, sort)):
+        if row.get('unindexed'):
+            typer.echo(t('cli.TXT_LIST_ENTRY_NOT_INDEXED', index=i + 1, name=row['name']))
+            continue
+        built = time.strftime('%Y-%m-%d %H:%M', time.localtime(row['built_at'])) if row.get('built_at') else t('cli.TXT_LIST_NEVER_BUILT')
+        line = t('cli.TXT_LIST_ENTRY', index=i + 1, name=row['name'], nodes=row.get('nodes', '?'),
+                 edges=row.get('edges', '?'), built=built)
+        if is_stale(row):
+            typer.echo(line + t('cli.TXT_LIST_STALE_MARK'))
+        else:
+            typer.echo(line)
+
+
+@cli_app.command(name="reindex", help=t('cli.TXT_REINDEX_COMMAND_HELP'))
+def reindex_cmd(
+    jobs: Optional[int] = typer.Option(None, "--jobs", "-j", min=1, help=t('cli.TXT_REINDEX_JOBS_HELP'))
+):
+    """并行扫描所有工程，重建工程目录文件。"""
+    start = time.perf_counter()
+    count = _reindex_projects(jobs)
+    typer.echo(t('cli.TXT_REINDEX_DONE', count=count, seconds=time.perf_counter() - start))
+
+
+@cli_app.command(name="import", help=t('cli.TXT_IMPORT_COMMAND_HELP'))
+def import_project_cmd(
+    project_name: str = typer.Argument(..., help=t('cli.TXT_IMPORT_PROJECT_NAME_HELP')),
+    nodes: Path = typer.Option(..., "--nodes", exists=True, dir_okay=False, help=t('cli.TXT_IMPORT_NODES_HELP')),
+    edges: Optional[Path] = typer.Option(None, "--edges", exists=True, dir_okay=False, help=t('cli.TXT_IMPORT_EDGES_HELP')),
+    node_map: Optional[List[str]] = typer.Option(None, "--node-map", help=t('cli.TXT_IMPORT_NODE_MAP_HELP')),
+    edge_map: Optional[List[str]] = typer.Option(None, "--edge-map", help=t('cli.TXT_IMPORT_EDGE_MAP_HELP')),
+    tags_sep: str = typer.Option(",", "--tags-sep", help=t('cli.TXT_IMPORT_TAGS_SEP_HELP')),
+    chunk_size: int = typer.Option(DEFAULT_CHUNK_SIZE, "--chunk-size", min=1, help=t('cli.TXT_IMPORT_CHUNK_SIZE_HELP')),
+    no_cache: bool = typer.Option(False, "--no-cache", help=t('cli.TXT_IMPORT_NO_CACHE_HELP')),
+    overwrite: bool = typer.Option(False, "--overwrite", help=t('cli.TXT_IMPORT_OVERWRITE_HELP'))
+):
+    """从 CSV/TSV/JSONL 节点表和边表分块导入数据到工程中。"""
+    ensure_projects_dir()
+    projects_full_path = Path(config['settings']['projects_directory_full_path'])
+
+    if not is_valid_project_name(project_name):
+        typer.secho(t('cli.TXT_PROJECT_NAME_INVALID_CHARS'), fg=typer.colors.RED, err=True)
+        raise typer.Exit(code=1)
+
+    try:
+        node_columns = parse_column_map(node_map, NODE_FIELDS)
+        edge_columns = parse_column_map(edge_map, EDGE_FIELDS)
+    except ValueError as e:
+        typer.secho(str(e), fg=typer.colors.RED, err=True)
+        raise typer.Exit(code=1)
+
+    project_path = projects_full_path / project_name
+    project_instance = SkillTreeProject(
+        project_path=str(project_path),
+        config=config.get('settings', {}),
+        lang_strings=lang_strings
+    )
+    if Path(project_instance.relations_file).exists() and not overwrite:
+        typer.secho(t('cli.TXT_IMPORT_TARGET_EXISTS', file_path=project_instance.relations_file), fg=typer.colors.YELLOW, err=True)
+        raise typer.Exit(code=1)
+    project_path.mkdir(parents=True, exist_ok=True)
+
+    use_cache = config.get('settings', {}).get('use_graph_cache', True) and not no_cache
+
+    def report_progress(kind, processed):
+        typer.echo(t('cli.TXT_IMPORT_PROGRESS', kind=kind, count=processed))
+
+    try:
+        # 持有工程锁：导入会整体替换 graph.yaml，旧的编辑日志随之作废
+        with project_instance.journal.lock():
+            stats = import_edge_lists(
+                project_instance.relations_file,
+                str(nodes),
+                str(edges) if edges else None,
+                cache_file=project_instance.cache_file if use_cache else None,
+                node_columns=node_columns,
+                edge_columns=edge_columns,
+                tags_sep=tags_sep,
+                chunk_size=chunk_size,
+                progress=report_progress,
+                compact=config.get('settings', {}).get('compact_attributes', True)
+            )
+            project_instance.journal.clear()
+    except (OSError, ValueError) as e:
+        typer.secho(t('cli.TXT_IMPORT_FAILED', error_message=str(e)), fg=typer.colors.RED, err=True)
+        raise typer.Exit(code=1)
+
+    # 目录记录图中的实际数量 (重复的节点 / 边已合并)，与 open 的结果一致
+    _project_catalog().update(str(project_path), nodes=stats['graph_nodes'], edges=stats['graph_edges'])
+    typer.echo(t('cli.TXT_IMPORT_DONE', project_name=project_name, **stats))
+
+
+@cli_app.command(name="diff", help=t('cli.TXT_DIFF_COMMAND_HELP'))
+def diff_cmd(
+    old: str = typer.Argument(..., help=t('cli.TXT_DIFF_OLD_HELP')),
+    new: str = typer.Argument(..., help=t('cli.TXT_DIFF_NEW_HELP')),
+    output_format: str = typer.Option("text", "--format", help=t('cli.TXT_DIFF_FORMAT_HELP')),
+    html: Optional[Path] = typer.Option(None, "--html", dir_okay=False, help=t('cli.TXT_DIFF_HTML_HELP'))
+):
+    """比较两个版本的图谱，报告新增、删除和修改的节点与边。"""
+    if output_format not in ("text", "json"):
+        typer.secho(t('cli.TXT_DIFF_INVALID_FORMAT', output_format=output_format), fg=typer.colors.RED, err=True)
+        raise typer.Exit(code=1)
+
+    graphs = []
+    # 加载过程中的提示信息写到 stderr，保证 --format json 时 stdout 只有 JSON
+    with redirect_stdout(sys.stderr):
+        for spec in (old, new):
+            project_instance = resolve_graph_source(spec)
+            if project_instance is None:
+                typer.secho(t('cli.TXT_DIFF_SOURCE_NOT_FOUND', source=spec), fg=typer.colors.RED, err=True)
+                raise typer.Exit(code=1)
+            project_instance.load_relations()
+            if project_instance.graph is None:
+                raise typer.Exit(code=1)
+            graphs.append(project_instance.graph)
+
+    result = diff_graphs(graphs[0], graphs[1])
+
+    if output_format == "json":
+        typer.echo(json.dumps(result, ensure_ascii=False, indent=2, default=str))
+    else:
+        line_colors = {'added': typer.colors.GREEN, 'removed': typer.colors.RED, 'changed': typer.colors.YELLOW}
+        for line, status in format_diff_text(result):
+            typer.secho(line, fg=line_colors.get(status))
+        if is_empty_diff(result):
+            typer.echo(t('cli.TXT_DIFF_NO_CHANGES'))
+        else:
+            typer.echo(t('cli.TXT_DIFF_SUMMARY', **result['summary']))
+
+    if html:
+        write_diff_html(graphs[0], graphs[1], result, str(html))
+        typer.echo(t('cli.TXT_DIFF_HTML_SAVED', file_path=str(html)), err=output_format == "json")
+
+
+def _require_project(project_name: str) -> SkillTreeProject:
+    """返回已存在工程的 SkillTreeProject 实例；工程不存在时打印错误并退出。"""
+    project_path = Path(config['settings']['projects_directory_full_path']) / project_name
+    if not project_path.is_dir():
+        typer.secho(t('cli.TXT_PROJECT_NOT_FOUND', project_name=project_name), fg=typer.colors.RED, err=True)
+        raise typer.Exit(code=1)
+    return SkillTreeProject(
+        project_path=str(project_path),
+        config=config.get('settings', {}),
+        lang_strings=lang_strings
+    )
+
+
+def _append_journal_op(project_name: str, op: dict, project_instance: Optional[SkillTreeProject] = None):
+    """将一个编辑操作写入工程的编辑日志。"""
+    project_instance = project_instance or _require_project(project_name)
+    try:
+        project_instance.journal.append([op])
+    except ValueError as e:
+        typer.secho(t('cli.TXT_JOURNAL_OP_INVALID', error_message=e), fg=typer.colors.RED, err=True)
+        raise typer.Exit(code=1)
+    # 只刷新时间戳，使已生成的产物显示为过期；计数在下次 open / reindex 时更新
+    _project_catalog().update(project_instance.project_path)
+    typer.echo(t('cli.TXT_JOURNAL_OP_APPENDED', op=op['op'], project_name=project_name))
+
+
+@cli_app.command(name="add-node", help=t('cli.TXT_ADD_NODE_COMMAND_HELP'))
+def add_node_cmd(
+    project_name: str = typer.Argument(..., help=t('cli.TXT_PROJECT_NAME_TO_OPEN_PROMPT')),
+    node_id: str = typer.Argument(..., help=t('cli.TXT_NODE_ID_HELP')),
+    label: Optional[str] = typer.Option(None, "--label", help=t('cli.TXT_NODE_LABEL_HELP')),
+    level: Optional[str] = typer.Option(None, "--level", help=t('cli.TXT_NODE_LEVEL_HELP')),
+    tags: Optional[str] = typer.Option(None, "--tags", help=t('cli.TXT_NODE_TAGS_HELP')),
+    attr: Optional[List[str]] = typer.Option(None, "--attr", help=t('cli.TXT_ATTR_OPTION_HELP'))
+):
+    """向工程的编辑日志追加一个“添加节点”操作。"""
+    node = {'id': node_id}
+    if label is not None:
+        node['label'] = label
+    if level is not None:
+        node['level'] = level
+    if tags is not None:
+        node['tags'] = [tag.strip() for tag in tags.split(',') if tag.strip()]
+    node.update(parse_attr_options(attr, reserved=('id',)))
+    _append_journal_op(project_name, {'op': 'add_node', 'node': node})
+
+
+@cli_app.command(name="add-edge", help=t('cli.TXT_ADD_EDGE_COMMAND_HELP'))
+def add_edge_cmd(
+    project_name: str = typer.Argument(..., help=t('cli.TXT_PROJECT_NAME_TO_OPEN_PROMPT')),
+    source: str = typer.Argument(..., help=t('cli.TXT_EDGE_SOURCE_HELP')),
+    target: str = typer.Argument(..., help=t('cli.TXT_EDGE_TARGET_HELP')),
+    edge_type: Optional[str] = typer.Option(None, "--type", help=t('cli.TXT_EDGE_TYPE_HELP')),
+    strength: Optional[float] = typer.Option(None, "--strength", help=t('cli.TXT_EDGE_STRENGTH_HELP')),
+    attr: Optional[List[str]] = typer.Option(None, "--attr", help=t('cli.TXT_ATTR_OPTION_HELP'))
+):
+    """向工程的编辑日志追加一个“添加边”操作。两个端点必须已存在于当前的图 (含编辑日志) 中。"""
+    project_instance = _require_project(project_name)
+    # 端点不存在的边在每次加载时都会被跳过，不应写入日志；加载过程的提示输出到 stderr
+    with redirect_stdout(sys.stderr):
+        project_instance.load_relations()
+    if project_instance.graph is not None:
+        for node_id in (source, target):
+            if node_id not in project_instance.graph:
+                typer.secho(t('cli.TXT_EDGE_ENDPOINT_MISSING', node_id=node_id, project_name=project_name),
+                            fg=typer.colors.RED, err=True)
+                raise typer.Exit(code=1)
+    edge = {'source': source, 'target': target}
+    if edge_type is not None:
+        edge['type'] = edge_type
+    if strength is not None:
+        edge['strength'] = strength
+    edge.update(parse_attr_options(attr, reserved=('source', 'target')))
+    _append_journal_op(project_name, {'op': 'add_edge', 'edge': edge}, project_instance)
+
+
+@cli_app.command(name="remove-node", help=t('cli.TXT_REMOVE_NODE_COMMAND_HELP'))
+def remove_node_cmd(
+    project_name: str = typer.Argument(..., help=t('cli.TXT_PROJECT_NAME_TO_OPEN_PROMPT')),
+    node_id: str = typer.Argument(..., help=t('cli.TXT_NODE_ID_HELP'))
+):
+    """向工程的编辑日志追加一个“删除节点”操作 (同时删除与其相连的边)。"""
+    _append_journal_op(project_name, {'op': 'remove_node', 'id': node_id})
+
+
+@cli_app.command(name="remove-edge", help=t('cli.TXT_REMOVE_EDGE_COMMAND_HELP'))
+def remove_edge_cmd(
+    project_name: str = typer.Argument(..., help=t('cli.TXT_PROJECT_NAME_TO_OPEN_PROMPT')),
+    source: str = typer.Argument(..., help=t('cli.TXT_EDGE_SOURCE_HELP')),
+    target: str = typer.Argument(..., help=t('cli.TXT_EDGE_TARGET_HELP'))
+):
+    """向工程的编辑日志追加一个“删除边”操作。"""
+    _append_journal_op(project_name, {'op': 'remove_edge', 'source': source, 'target': target})
+
+
+@cli_app.command(name="compact", help=t('cli.TXT_COMPACT_COMMAND_HELP'))
+def compact_cmd(
+    project_name: str = typer.Argument(..., help=t('cli.TXT_PROJECT_NAME_TO_OPEN_PROMPT'))
+):
+    """将工程的编辑日志折叠回 graph.yaml。"""
+    project_instance = _require_project(project_name)
+    if not project_instance.journal.exists():
+        typer.echo(t('cli.TXT_JOURNAL_EMPTY', project_name=project_name))
+        return
+    compacted = project_instance.compact_journal()
+    if compacted is None:
+        typer.secho(t('cli.TXT_COMPACT_FAILED', project_name=project_name), fg=typer.colors.RED, err=True)
+        raise typer.Exit(code=1)
+    folded, skipped = compacted
+    _project_catalog().update(project_instance.project_path, nodes=project_instance.graph.number_of_nodes(),
+                              edges=project_instance.graph.number_of_edges())
+    typer.echo(t('cli.TXT_COMPACT_DONE', count=folded, file_path=project_instance.relations_file))
+    if skipped:
+        typer.secho(t('cli.TXT_COMPACT_SKIPPED', count=skipped), fg=typer.colors.YELLOW, err=True)
+
+
+@cli_app.command(name="export", help=t('cli.TXT_EXPORT_COMMAND_HELP'))
+def export_cmd(
+    project_name: str = typer.Argument(..., help=t('cli.TXT_PROJECT_NAME_TO_OPEN_PROMPT')),
+    output_format: str = typer.Option("gexf", "--format", help=t('cli.TXT_EXPORT_FORMAT_HELP', formats=", ".join(EXPORTERS))),
+    output: Optional[Path] = typer.Option(None, "--output", "-o", dir_okay=False, help=t('cli.TXT_EXPORT_OUTPUT_HELP')),
+    min_degree: int = typer.Option(0, "--min-degree", min=0, help=t('cli.TXT_EXPORT_MIN_DEGREE_HELP')),
+    max_edges: int = typer.Option(DEFAULT_MAX_EDGES, "--max-edges", min=0, help=t('cli.TXT_EXPORT_MAX_EDGES_HELP')),
+    max_labels: int = typer.Option(DEFAULT_MAX_LABELS, "--max-labels", min=0, help=t('cli.TXT_EXPORT_MAX_LABELS_HELP')),
+    iterations: Optional[int] = typer.Option(None, "--iterations", min=0, help=t('cli.TXT_EXPORT_ITERATIONS_HELP')),
+    fresh_layout: bool = typer.Option(False, "--fresh-layout", help=t('cli.TXT_EXPORT_FRESH_LAYOUT_HELP'))
+):
+    """将工程图谱导出为注册表 (src/exporters.py) 中的任一格式 (无需浏览器)。"""
+    exporter = get_exporter(output_format)
+    if exporter is None:
+        typer.secho(t('cli.TXT_EXPORT_INVALID_FORMAT', output_format=output_format, formats=", ".join(EXPORTERS)),
+                    fg=typer.colors.RED, err=True)
+        raise typer.Exit(code=1)
+    if output_format != 'svg':
+        # 以下选项只对 SVG 有意义，用在其它格式上多半是误用，直接报错而不是静默忽略
+        svg_only = {'--min-degree': min_degree != 0, '--max-edges': max_edges != DEFAULT_MAX_EDGES,
+                    '--max-labels': max_labels != DEFAULT_MAX_LABELS, '--iterations': iterations is not None,
+                    '--fresh-layout': fresh_layout}
+        given = [name for name, is_set in svg_only.items() if is_set]
+        if given:
+            typer.secho(t('cli.TXT_EXPORT_SVG_ONLY_OPTIONS', options=", ".join(given), output_format=output_format),
+                        fg=typer.colors.RED, err=True)
+            raise typer.Exit(code=1)
+
+    project_instance = _require_project(project_name)
+    if not project_instance.load_relations() or not project_instance.graph:
+        raise typer.Exit(code=1)
+
+    output_file = str(output) if output else exporter.default_output_file(project_instance)
+    start = time.perf_counter()
+    try:
+        written_nodes, written_edges = exporter.writer(
+            project_instance, output_file,
+            min_degree=min_degree,
+            max_edges=max_edges or None, # 0 表示不限制
+            max_labels=max_labels,
+            iterations=iterations,
+            fresh_layout=fresh_layout
+        )
+    except (OSError, ValueError) as e:
+        typer.secho(t('cli.TXT_EXPORT_FAILED', output_format=output_format, file_path=output_file, error_message=e),
+                    fg=typer.colors.RED, err=True)
+        raise typer.Exit(code=1)
+    typer.echo(t('cli.TXT_EXPORT_DONE', output_format=output_format, file_path=output_file,
+                 nodes=written_nodes, edges=written_edges,
+                 total_nodes=project_instance.graph.number_of_nodes(),
+                 total_edges=project_instance.graph.number_of_edges(),
+                 size_kb=os.path.getsize(output_file) / 1024,
+                 seconds=time.perf_counter() - start))
+
+
+@cli_app.command(name="communities", help=t('cli.TXT_COMMUNITIES_COMMAND_HELP'))
+def communities_cmd(
+    project_name: str = typer.Argument(..., help=t('cli.TXT_PROJECT_NAME_TO_OPEN_PROMPT')),
+    levels: int = typer.Option(DEFAULT_MAX_LEVELS, "--levels", min=1, help=t('cli.TXT_COMMUNITY_LEVELS_HELP')),
+    output_format: str = typer.Option("text", "--format", help=t('cli.TXT_DIFF_FORMAT_HELP'))
+):
+    """检测工程图谱的社区结构并打印多层摘要。"""
+    if output_format not in ("text", "json"):
+        typer.secho(t('cli.TXT_DIFF_INVALID_FORMAT', output_format=output_format), fg=typer.colors.RED, err=True)
+        raise typer.Exit(code=1)
+
+    project_instance = _require_project(project_name)
+    # --format json 时 stdout 只输出 JSON
+    with redirect_stdout(sys.stderr if output_format == "json" else sys.stdout):
+        if not project_instance.load_relations() or not project_instance.graph:
+            raise typer.Exit(code=1)
+        summary = project_instance.detect_communities(max_levels=levels)
+
+    if output_format == "json":
+        typer.echo(json.dumps(summary, ensure_ascii=False, indent=2, default=str))
+    else:
+        project_instance.print_community_summary()
+
+
+def _raise_keyboard_interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+
+@cli_app.command(name="serve", help=t('cli.TXT_SERVE_COMMAND_HELP'))
+def serve_cmd(
+    project_name: str = typer.Argument(..., help=t('cli.TXT_PROJECT_NAME_TO_OPEN_PROMPT')),
+    port: Optional[int] = typer.Option(None, "--port", help=t('cli.TXT_SERVE_PORT_HELP')),
+    host: str = typer.Option("127.0.0.1", "--host", help=t('cli.TXT_SERVE_HOST_HELP')),
+    batch_interval_ms: int = typer.Option(int(DEFAULT_BATCH_INTERVAL * 1000), "--batch-interval", min=0, help=t('cli.TXT_SERVE_BATCH_INTERVAL_HELP')),
+    max_batch: int = typer.Option(DEFAULT_MAX_BATCH, "--max-batch", min=1, help=t('cli.TXT_SERVE_MAX_BATCH_HELP')),
+    verbose: bool = typer.Option(False, "--verbose", help=t('cli.TXT_SERVE_VERBOSE_HELP'))
+):
+    """以常驻服务的方式加载工程，通过 JSON 接口提供并发查询与修改。"""
+    project_instance = _require_project(project_name)
+    service = GraphService(project_instance, batch_interval=batch_interval_ms / 1000.0, max_batch=max_batch)
+    if not service.start():
+        raise typer.Exit(code=1)
+
+    server_port = port if port is not None else int(config['settings'].get('web_server_port', 5000))
+    try:
+        httpd = create_server(service, host, server_port, verbose=verbose)
+    except OSError as e:
+        service.stop()
+        typer.secho(t('cli.TXT_SERVER_START_ERROR', error_message=str(e)), fg=typer.colors.RED, err=True)
+        raise typer.Exit(code=1)
+
+    typer.echo(t('cli.TXT_SERVE_STARTED', project_name=project_name, url=f"http://{host}:{server_port}/api/info"))
+    # 将 SIGTERM 视同 CTRL+C，使作为后台守护进程运行时也能正常退出并写完未完成的批次
+    previous_sigterm_handler = signal.signal(signal.SIGTERM, _raise_keyboard_interrupt)
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        try:
+            typer.echo(t('cli.TXT_SERVE_STOPPING'))
+            httpd.server_close()
+            service.stop()
+        finally:
+            # 服务停止后恢复原来的 SIGTERM 处理 (例如在 shell 模式中调用 serve 之后)
+            signal.signal(signal.SIGTERM, previous_sigterm_handler)
 
 
 def start_local_server(project_name_for_msg: str, project_path: Path, html_file_name: str, port: int):
@@ -144,11 +613,14 @@ def start_local_server(project_name_for_msg: str, project_path: Path, html_file_
     _http_server_instance = None
     _http_server_thread = None
 
-    Handler = partial(http.server.SimpleHTTPRequestHandler, directory=str(project_path))
+    # 静态文件服务，同时接收页面回传的节点坐标 (POST /api/positions)
+    Handler = partial(ProjectFileRequestHandler, directory=str(project_path),
+                      positions_file=str(project_path / POSITIONS_FILE_NAME))
 
     try:
         socketserver.TCPServer.allow_reuse_address = True
-        httpd = socketserver.TCPServer(("", port), Handler)
+        # 只监听本机回环地址：该服务器接受写入 positions.json 的 POST，不应暴露给局域网中的其它主机
+        httpd = socketserver.TCPServer(("127.0.0.1", port), Handler)
         _http_server_instance = httpd
     except OSError as e:
         if e.errno == 98: # Address already in use
@@ -159,7 +631,7 @@ def start_local_server(project_name_for_msg: str, project_path: Path, html_file_
             typer.secho(t('cli.TXT_SERVER_START_ERROR', error_message=str(e)), fg=typer.colors.RED, err=True)
             return None
 
-    server_url = f"http://localhost:{port}/{html_file_name}"
+    server_url = f"http://127.0.0.1:{port}/{html_file_name}"
     typer.echo("---")
     typer.echo(t('cli.TXT_SERVER_STARTED_AT_NO_CLIPBOARD', project_name=project_name_for_msg, html_file_name=html_file_name, url=server_url))
     # typer.echo(t('cli.TXT_SERVER_INFO_COPY_URL')) # 这句可以保留，或者合并到上面的消息中
@@ -190,6 +662,8 @@ def open_project_cmd(
     skip_analyze: bool = typer.Option(False, "--skip-analyze", help=t('cli.TXT_SKIP_ANALYZE_HELP')),
     skip_export_gexf: bool = typer.Option(False, "--skip-export-gexf", help=t('cli.TXT_SKIP_EXPORT_GEXF_HELP')),
     skip_query: bool = typer.Option(False, "--skip-query", help=t('cli.TXT_SKIP_QUERY_HELP')),
+    communities: bool = typer.Option(False, "--communities", help=t('cli.TXT_COMMUNITIES_OPTION_HELP')),
+    from_binary: Optional[Path] = typer.Option(None, "--from-binary", exists=True, dir_okay=False, help=t('cli.TXT_FROM_BINARY_HELP')),
     serve_only: bool = typer.Option(False, "--serve-only", help=t('cli.TXT_SERVE_ONLY_HELP'))
 ):
     """打开并处理一个已存在的技能树工程，并可选地启动本地HTTP服务器提供可视化结果。"""
@@ -211,8 +685,14 @@ def open_project_cmd(
             skip_vis=skip_vis,
             skip_analyze=skip_analyze,
             skip_export_gexf=skip_export_gexf,
-            skip_query=skip_query
+            skip_query=skip_query,
+            communities=communities,
+            binary_file=str(from_binary) if from_binary else None
         )
+        # 目录记录的是 graph.yaml 的规模，从二进制快照打开时不更新
+        if project_instance.graph is not None and not from_binary:
+            _project_catalog().update(str(project_path), nodes=project_instance.graph.number_of_nodes(),
+                                      edges=project_instance.graph.number_of_edges())
     else:
         if not Path(project_instance.html_export_file).exists():
             typer.secho(t('cli.TXT_HTML_NOT_FOUND_FOR_SERVE_ONLY', file_path=project_instance.html_export_file), fg=typer.colors.RED, err=True)
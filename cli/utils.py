@@ -1,8 +1,11 @@
 # /cli/utils.py
+import os
 import typer
+import yaml
 from pathlib import Path
-from typing import List
-from settings import config, t # 从 settings.py 导入全局配置 config 和翻译函数 t
+from typing import Any, Dict, List, Optional
+from settings import config, lang_strings, t # 从 settings.py 导入全局配置 config 和翻译函数 t
+from src.core import SkillTreeProject
 
 def ensure_projects_dir():
     """确保项目目录存在，如果不存在则创建它。"""
@@ -21,17 +24,69 @@ def ensure_projects_dir():
         typer.secho(f"错误：创建项目目录 {projects_dir_str} 失败: {e}", fg=typer.colors.RED, err=True)
 
 
+INVALID_PROJECT_NAME_CHARS = ['/', '\\', ':', '*', '?', '"', '<', '>', '|', ' ']
+
+
+def is_valid_project_name(project_name: str) -> bool:
+    """检查工程名是否非空且不包含非法字符 (包括空格)。"""
+    return bool(project_name) and not any(c in project_name for c in INVALID_PROJECT_NAME_CHARS)
+
+
 def list_existing_projects_paths() -> List[Path]:
     """列出所有已存在项目的路径对象列表。"""
     ensure_projects_dir() # 首先确保项目根目录存在
     try:
         projects_full_path = Path(config['settings']['projects_directory_full_path'])
         if projects_full_path.exists() and projects_full_path.is_dir():
-            # 返回目录中所有子目录的Path对象列表，并排序
-            return sorted([d for d in projects_full_path.iterdir() if d.is_dir()])
+            # 返回目录中所有子目录的Path对象列表，并排序。
+            # os.scandir 的 is_dir() 多数平台上直接使用目录项类型，无需对每个子目录再 stat
+            with os.scandir(projects_full_path) as it:
+                return sorted(Path(entry.path) for entry in it if entry.is_dir())
     except KeyError:
         typer.secho("错误：配置中未找到 'projects_directory_full_path'。无法列出项目。", fg=typer.colors.RED, err=True)
     except Exception as e:
         projects_dir_str = config.get('settings', {}).get('projects_directory_full_path', '未知目录')
         typer.secho(f"错误：列出项目 {projects_dir_str} 中的项目失败: {e}", fg=typer.colors.RED, err=True)
-    return [] # 出错或没有项目时返回空列表
\ No newline at end of file
+    return [] # 出错或没有项目时返回空列表
+
+
+def resolve_graph_source(spec: str) -> Optional[SkillTreeProject]:
+    """
+    将 “工程名 / 工程目录 / YAML 文件路径” 解析为 SkillTreeProject 实例。
+    优先匹配 projects 目录下的同名工程；无法解析时返回 None。
+    """
+    settings_config = config.get('settings', {})
+    projects_full_path = Path(settings_config.get('projects_directory_full_path', '.'))
+    project_path = projects_full_path / spec
+    if is_valid_project_name(spec) and project_path.is_dir():
+        return SkillTreeProject(project_path=str(project_path), config=settings_config, lang_strings=lang_strings)
+
+    path = Path(spec)
+    if path.is_file():
+        return SkillTreeProject(project_path=str(path.parent), config=settings_config,
+                                lang_strings=lang_strings, relations_file=str(path))
+    if path.is_dir() and (path / 'graph.yaml').is_file():
+        return SkillTreeProject(project_path=str(path), config=settings_config, lang_strings=lang_strings)
+    return None
+
+
+
+def parse_attr_options(items: Optional[List[str]], reserved=()) -> Dict[str, Any]:
+    """
+    将 ["key=value", ...] 形式的命令行参数解析为属性字典。
+    值按 YAML 标量解析，因此 5、0.8、true 会分别得到整数、浮点数和布尔值。
+    :param reserved: 由位置参数给出、不允许通过 --attr 覆盖的键 (如节点的 id)。
+    """
+    attrs: Dict[str, Any] = {}
+    for item in items or []:
+        key, sep, raw_value = item.partition('=')
+        key = key.strip()
+        if not sep or not key:
+            raise typer.BadParameter(t('cli.TXT_INVALID_ATTR_OPTION', item=item))
+        if key in reserved:
+            raise typer.BadParameter(t('cli.TXT_ATTR_RESERVED_KEY', name=key))
+        try:
+            attrs[key] = yaml.safe_load(raw_value) if raw_value.strip() else ''
+        except yaml.YAMLError:
+            attrs[key] = raw_value
+    return attrs
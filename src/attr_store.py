@@ -0,0 +1,222 @@
+import math
+import sys
+from array import array
+from collections.abc import MutableMapping
+
+import networkx as nx
+
+# 列式存储的固定字段及其类型：
+#   'object' - Python 列表 (字符串会被 intern)，适合几乎每个元素都有、但取值各不相同的字段
+#   'coded'  - 字典编码：取值表 + array('I') 编码列，适合大量重复的字符串
+#   'float'  - array('d')，NaN 表示缺失
+NODE_COLUMNS = {'label': 'object', 'level': 'coded', 'tags': 'coded'}
+EDGE_COLUMNS = {'type': 'coded', 'strength': 'float'}
+
+_ABSENT_CODE = 0 # 编码 0 保留为“无此属性”
+
+
+class _Missing:
+    """object 列中“无此属性”的哨兵；按名称 pickle，保证反序列化后仍是同一个对象。"""
+    __slots__ = ()
+
+    def __reduce__(self):
+        return '_MISSING'
+
+
+_MISSING = _Missing()
+
+
+def intern_value(value):
+    """对字符串取值进行 intern，使重复字符串在内存中只保留一份。"""
+    return sys.intern(value) if type(value) is str else value
+
+
+class ValueTable:
+    """字典编码的取值表：值 <-> 整数编码，编码从 1 开始。"""
+    __slots__ = ('values', 'codes')
+
+    def __init__(self):
+        self.values = [None]
+        self.codes = {}
+
+    def encode(self, value):
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.values)
+            value = intern_value(value)
+            self.values.append(value)
+            self.codes[value] = code
+        return code
+
+    def decode(self, code):
+        return self.values[code]
+
+
+class ColumnTable:
+    """
+    一类元素 (节点或边) 的列式属性表。
+    每个元素占用一行，固定字段按列存放于类型化数组中。
+    """
+    def __init__(self, schema):
+        self.schema = dict(schema)
+        self.size = 0
+        self.columns = {}
+        self.value_tables = {}
+        for name, kind in self.schema.items():
+            if kind == 'coded':
+                self.columns[name] = array('I')
+                self.value_tables[name] = ValueTable()
+            elif kind == 'float':
+                self.columns[name] = array('d')
+            else:
+                self.columns[name] = []
+
+    def new_row(self):
+        """追加一个所有字段均缺失的新行，返回行号。"""
+        for name, kind in self.schema.items():
+            if kind == 'coded':
+                self.columns[name].append(_ABSENT_CODE)
+            elif kind == 'float':
+                self.columns[name].append(math.nan)
+            else:
+                self.columns[name].append(_MISSING)
+        row = self.size
+        self.size += 1
+        return row
+
+    def accepts(self, name, value):
+        """判断某个值能否放入该列；不能放入的值由调用方存入附加字典。"""
+        kind = self.schema[name]
+        if kind == 'coded':
+            return type(value) is str
+        if kind == 'float':
+            return type(value) is float and not math.isnan(value)
+        return True
+
+    def get(self, name, row):
+        kind = self.schema[name]
+        if kind == 'coded':
+            code = self.columns[name][row]
+            return _MISSING if code == _ABSENT_CODE else self.value_tables[name].decode(code)
+        if kind == 'float':
+            value = self.columns[name][row]
+            return _MISSING if math.isnan(value) else value
+        return self.columns[name][row]
+
+    def set(self, name, row, value):
+        kind = self.schema[name]
+        if kind == 'coded':
+            self.columns[name][row] = self.value_tables[name].encode(value)
+        elif kind == 'float':
+            self.columns[name][row] = value
+        else:
+            self.columns[name][row] = intern_value(value)
+
+    def clear(self, name, row):
+        kind = self.schema[name]
+        if kind == 'coded':
+            self.columns[name][row] = _ABSENT_CODE
+        elif kind == 'float':
+            self.columns[name][row] = math.nan
+        else:
+            self.columns[name][row] = _MISSING
+
+
+class AttrView(MutableMapping):
+    """
+    单个节点/边的属性字典视图。
+    固定字段读写到 ColumnTable 的对应行，其余字段放在按需创建的附加字典中。
+    行号在第一次写入固定字段时才分配，因此 networkx 在 add_edge 中
+    “预先创建再丢弃”的属性字典不会占用表空间。
+    """
+    __slots__ = ('_table', '_row', '_extra')
+
+    def __init__(self, table):
+        self._table = table
+        self._row = -1
+        self._extra = None
+
+    def __getitem__(self, key):
+        if key in self._table.schema:
+            if self._row >= 0:
+                value = self._table.get(key, self._row)
+                if value is not _MISSING:
+                    return value
+        if self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key in self._table.schema and self._table.accepts(key, value):
+            if self._row < 0:
+                self._row = self._table.new_row()
+            self._table.set(key, self._row, value)
+            if self._extra is not None:
+                self._extra.pop(key, None)
+            return
+        if key in self._table.schema and self._row >= 0:
+            self._table.clear(key, self._row)
+        if self._extra is None:
+            self._extra = {}
+        self._extra[key] = intern_value(value)
+
+    def __delitem__(self, key):
+        found = False
+        if key in self._table.schema and self._row >= 0:
+            if self._table.get(key, self._row) is not _MISSING:
+                self._table.clear(key, self._row)
+                found = True
+        if self._extra is not None and key in self._extra:
+            del self._extra[key]
+            found = True
+        if not found:
+            raise KeyError(key)
+
+    def __iter__(self):
+        if self._row >= 0:
+            for name in self._table.schema:
+                if self._table.get(name, self._row) is not _MISSING:
+                    yield name
+        if self._extra is not None:
+            yield from self._extra
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+    def copy(self):
+        """与 dict.copy 一致，返回普通字典 (networkx 的 copy/导出会调用)。"""
+        return dict(self)
+
+    __copy__ = copy
+
+    def __deepcopy__(self, memo):
+        from copy import deepcopy
+        return deepcopy(dict(self), memo)
+
+    def __getstate__(self):
+        return (self._table, self._row, self._extra)
+
+    def __setstate__(self, state):
+        self._table, self._row, self._extra = state
+
+
+class CompactDiGraph(nx.DiGraph):
+    """
+    属性紧凑存储的有向图。
+    对外接口与 nx.DiGraph 完全相同，G.nodes[n] / G.edges[u, v] 返回 AttrView；
+    level/type/strength 等固定字段按列存储，重复字符串被 intern 或字典编码。
+    删除节点或边不会回收其表行。
+    """
+    def __init__(self, incoming_graph_data=None, **attr):
+        self.node_table = ColumnTable(NODE_COLUMNS)
+        self.edge_table = ColumnTable(EDGE_COLUMNS)
+        super().__init__(incoming_graph_data, **attr)
+
+    def node_attr_dict_factory(self):
+        return AttrView(self.node_table)
+
+    def edge_attr_dict_factory(self):
+        return AttrView(self.edge_table)
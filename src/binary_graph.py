@@ -0,0 +1,310 @@
+import json
+import math
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+# 紧凑二进制图格式 (.skgb)，所有整数均为小端序：
+#   文件头   magic, 版本, 节点数, 边数, 字符串数, 元数据偏移, 元数据长度
+#   字符串表 UTF-8 数据区 + uint64 偏移数组 (字符串数 + 1) + uint8 类型数组 (0 为字符串，1 为 JSON 编码的其它值)
+#   节点     第 i 个节点的 id 为字符串 i；每个节点属性一列：uint32 字符串编号，或全为 float 时的 float64
+#   边       uint32 源节点下标数组、uint32 目标节点下标数组；每个边属性一列，规则同上
+#   元数据   JSON：属性列名与各区段的 (偏移, 长度)
+# 各区段按 8 字节对齐，读取时直接对 mmap 做 memoryview.cast，不复制数组。
+BINARY_MAGIC = b'SKGB'
+BINARY_VERSION = 1
+BINARY_EXTENSION = '.skgb'
+ABSENT = 0xFFFFFFFF # 属性列中表示“无此属性”
+
+_HEADER = struct.Struct('<4sIQQQQQ')
+_KIND_STR = 0
+_KIND_JSON = 1
+_UINT32 = 'I' if array('I').itemsize == 4 else 'L'
+_TYPECODES = {'uint32': _UINT32, 'float64': 'd'}
+_MISSING = object() # 拆列时表示“该行无此属性”；BinaryGraph.value 中表示“尚未缓存”
+
+
+class BinaryGraphError(ValueError):
+    """文件不是本格式、版本不支持或已损坏。"""
+
+
+def _uint32_array(values=()):
+    return array(_UINT32, values)
+
+
+class _StringTableWriter:
+    """边扫描图边写出字符串数据区；相同的 (类型, 文本) 只保存一次。"""
+    def __init__(self, f):
+        self.f = f
+        self.offsets = array('Q', [0])
+        self.kinds = array('B')
+        self.index = {}
+        self.position = 0
+
+    def add(self, value, dedupe=True):
+        if type(value) is str:
+            kind, text = _KIND_STR, value
+        else:
+            kind, text = _KIND_JSON, json.dumps(value, ensure_ascii=False, default=str)
+        key = (kind, text)
+        if dedupe:
+            code = self.index.get(key)
+            if code is not None:
+                return code
+        code = len(self.kinds)
+        self.index.setdefault(key, code)
+        data = text.encode('utf-8')
+        self.f.write(data)
+        self.position += len(data)
+        self.offsets.append(self.position)
+        self.kinds.append(kind)
+        return code
+
+
+def _collect_columns(rows, strings):
+    """
+    将属性字典按键拆成列。全部取值都是 float 的属性存为 float64 列 (NaN 表示缺失)，
+    其余属性存为 uint32 字符串编号列 (ABSENT 表示缺失)。
+    :param rows: 可迭代的属性字典。
+    :return: {属性名: array}。
+    """
+    values = {}
+    for row, attrs in enumerate(rows):
+        for key, value in attrs.items():
+            column = values.get(key)
+            if column is None:
+                column = values[key] = [_MISSING] * row
+            column.append(value)
+        for column in values.values():
+            if len(column) == row:
+                column.append(_MISSING)
+
+    columns = {}
+    for key, column in values.items():
+        if all(value is _MISSING or (type(value) is float and not math.isnan(value)) for value in column):
+            columns[key] = array('d', (math.nan if value is _MISSING else value for value in column))
+        else:
+            columns[key] = _uint32_array(ABSENT if value is _MISSING else strings.add(value) for value in column)
+    return columns
+
+
+def _column_type(column):
+    return 'float64' if column.typecode == 'd' else 'uint32'
+
+
+def write_binary_graph(graph, output_file):
+    """
+    将图写为紧凑二进制格式 (先写临时文件再原子替换)。
+    :return: (节点数, 边数)。
+    """
+    node_index = {node_id: i for i, node_id in enumerate(graph.nodes())}
+    if len(node_index) >= ABSENT:
+        raise BinaryGraphError("too many nodes for the binary format")
+    tmp_file = output_file + '.tmp'
+    sections = {}
+    try:
+        with open(tmp_file, 'wb') as f:
+            f.write(b'\0' * _HEADER.size)
+
+            def pad():
+                f.write(b'\0' * (-f.tell() % 8))
+
+            def write_section(name, data):
+                pad()
+                if sys.byteorder != 'little' and data.itemsize > 1:
+                    data = array(data.typecode, data)
+                    data.byteswap()
+                sections[name] = (f.tell(), len(data) * data.itemsize)
+                data.tofile(f)
+
+            strings_start = f.tell()
+            strings = _StringTableWriter(f)
+            # 节点 id 占据字符串 0..n-1，不参与去重，使节点下标与字符串编号一致
+            for node_id in node_index:
+                strings.add(node_id, dedupe=False)
+            node_columns = _collect_columns((attrs for _, attrs in graph.nodes(data=True)), strings)
+            sources, targets = _uint32_array(), _uint32_array()
+            for source, target in graph.edges():
+                sources.append(node_index[source])
+                targets.append(node_index[target])
+            edge_columns = _collect_columns((attrs for _, _, attrs in graph.edges(data=True)), strings)
+            sections['string_data'] = (strings_start, strings.position)
+
+            write_section('string_offsets', strings.offsets)
+            write_section('string_kinds', strings.kinds)
+            for name, column in node_columns.items():
+                write_section(f'node:{name}', column)
+            write_section('edge_sources', sources)
+            write_section('edge_targets', targets)
+            for name, column in edge_columns.items():
+                write_section(f'edge:{name}', column)
+
+            meta = json.dumps({
+                'node_columns': {name: _column_type(column) for name, column in node_columns.items()},
+                'edge_columns': {name: _column_type(column) for name, column in edge_columns.items()},
+                'sections': sections,
+            }, ensure_ascii=False).encode('utf-8')
+            pad()
+            meta_offset = f.tell()
+            f.write(meta)
+            f.seek(0)
+            f.write(_HEADER.pack(BINARY_MAGIC, BINARY_VERSION, len(node_index), len(sources),
+                                 len(strings.kinds), meta_offset, len(meta)))
+        os.replace(tmp_file, output_file)
+    except BaseException:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+        raise
+    return len(node_index), len(sources)
+
+
+class BinaryGraph:
+    """
+    以 mmap 打开的二进制图，打开本身只解析文件头和元数据，与图的规模无关。
+    sources / targets / 属性列均为直接指向映射内存的 memoryview；
+    字符串按需解码，标量值解码后缓存。用完需 close() (或使用 with 语句)。
+    """
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self._views = []
+        self._mmap = None
+        with open(file_path, 'rb') as f:
+            try:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError as e: # 空文件无法映射
+                raise BinaryGraphError(f"'{file_path}' is not a binary graph file: {e}") from e
+        try:
+            self._open()
+        except BaseException:
+            self.close()
+            raise
+
+    def _open(self):
+        buffer = self._mmap
+        if len(buffer) < _HEADER.size:
+            raise BinaryGraphError(f"'{self.file_path}' is too short to be a binary graph")
+        magic, version, node_count, edge_count, string_count, meta_offset, meta_length = \
+            _HEADER.unpack_from(buffer, 0)
+        if magic != BINARY_MAGIC:
+            raise BinaryGraphError(f"'{self.file_path}' is not a binary graph file")
+        if version != BINARY_VERSION:
+            raise BinaryGraphError(f"unsupported binary graph version {version}")
+        try:
+            meta = json.loads(buffer[meta_offset:meta_offset + meta_length].decode('utf-8'))
+        except ValueError as e:
+            raise BinaryGraphError(f"corrupt metadata in '{self.file_path}': {e}") from e
+
+        self.node_count = node_count
+        self.edge_count = edge_count
+        self.string_count = string_count
+        self._base = memoryview(buffer)
+        self._views.append(self._base)
+        sections = meta['sections']
+        offset, length = sections['string_data']
+        self._string_data = self._section(offset, length)
+        self._string_offsets = self._array(sections['string_offsets'], 'Q', string_count + 1)
+        self._string_kinds = self._array(sections['string_kinds'], 'B', string_count)
+        self.sources = self._array(sections['edge_sources'], _UINT32, edge_count)
+        self.targets = self._array(sections['edge_targets'], _UINT32, edge_count)
+        self.column_types = {'node': meta['node_columns'], 'edge': meta['edge_columns']}
+        self.node_columns = {name: self._array(sections[f'node:{name}'], _TYPECODES[column_type], node_count)
+                             for name, column_type in meta['node_columns'].items()}
+        self.edge_columns = {name: self._array(sections[f'edge:{name}'], _TYPECODES[column_type], edge_count)
+                             for name, column_type in meta['edge_columns'].items()}
+        self._values = {}
+
+    def _section(self, offset, length):
+        if offset + length > len(self._base):
+            raise BinaryGraphError(f"'{self.file_path}' is truncated")
+        view = self._base[offset:offset + length]
+        self._views.append(view)
+        return view
+
+    def _array(self, section, typecode, count):
+        offset, length = section
+        view = self._section(offset, length)
+        if sys.byteorder != 'little' and typecode != 'B':
+            # 大端机器上无法零拷贝，退回到复制并交换字节序
+            column = array(typecode, view.tobytes())
+            column.byteswap()
+            return column
+        view = view.cast(typecode)
+        if len(view) != count:
+            raise BinaryGraphError(f"'{self.file_path}' is corrupt")
+        self._views.append(view)
+        return view
+
+    def value(self, code):
+        """解码第 code 个字符串表项。列表等可变值每次都重新解码，避免多个属性共享同一对象。"""
+        value = self._values.get(code, _MISSING)
+        if value is not _MISSING:
+            return value
+        text = str(self._string_data[self._string_offsets[code]:self._string_offsets[code + 1]], 'utf-8')
+        if self._string_kinds[code] == _KIND_STR:
+            value = sys.intern(text)
+        else:
+            value = json.loads(text)
+            if isinstance(value, (list, dict)):
+                return value
+        self._values[code] = value
+        return value
+
+    def node_id(self, index):
+        return self.value(index)
+
+    def _attrs(self, columns, index):
+        """:param columns: [(属性名, 列, 是否为 float 列)]。"""
+        attrs = {}
+        for name, column, is_float in columns:
+            code = column[index]
+            if is_float:
+                if code == code: # NaN 表示缺失
+                    attrs[name] = code
+            elif code != ABSENT:
+                attrs[name] = self.value(code)
+        return attrs
+
+    def _column_list(self, domain):
+        columns = self.node_columns if domain == 'node' else self.edge_columns
+        types = self.column_types[domain]
+        return [(name, column, types[name] == 'float64') for name, column in columns.items()]
+
+    def node_attrs(self, index):
+        return self._attrs(self._column_list('node'), index)
+
+    def edge_attrs(self, index):
+        return self._attrs(self._column_list('edge'), index)
+
+    def to_graph(self, graph):
+        """
+        将全部节点与边 (按导出时的顺序) 加入给定的空图并返回它。
+        :param graph: 空图对象，例如 SkillTreeProject.new_graph() 的返回值。
+        """
+        node_ids = [self.value(i) for i in range(self.node_count)]
+        node_columns = self._column_list('node')
+        edge_columns = self._column_list('edge')
+        graph.add_nodes_from((node_ids[i], self._attrs(node_columns, i)) for i in range(self.node_count))
+        sources, targets = self.sources, self.targets
+        graph.add_edges_from((node_ids[sources[k]], node_ids[targets[k]], self._attrs(edge_columns, k))
+                             for k in range(self.edge_count))
+        return graph
+
+    def close(self):
+        # 必须先释放所有 memoryview，mmap 才能关闭
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        self.sources = self.targets = None
+        self.node_columns = self.edge_columns = {}
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
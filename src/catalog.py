@@ -0,0 +1,201 @@
+import hashlib
+import io
+import json
+import os
+import time
+from contextlib import redirect_stdout
+
+from .core import SkillTreeProject
+from .journal import JOURNAL_FILE_NAME
+from .storage import file_lock, file_signature
+
+CATALOG_FILE_NAME = '.catalog.json'
+CATALOG_LOCK_FILE_NAME = '.catalog.lock'
+CATALOG_VERSION = 1
+# open 流程生成的产物；任一产物缺失或比 graph.yaml / 编辑日志旧，即视为过期
+BUILD_ARTIFACTS = ('skill_tree.html', 'skill_tree.gexf')
+SORT_KEYS = ('name', 'size', 'built')
+
+
+def file_digest(path, chunk_size=1 << 20):
+    """流式计算文件内容的 blake2b 摘要 (十六进制)；文件不存在时返回 None。"""
+    digest = hashlib.blake2b(digest_size=16)
+    try:
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(chunk_size), b''):
+                digest.update(chunk)
+    except FileNotFoundError:
+        return None
+    return digest.hexdigest()
+
+
+def _artifact_mtimes(project_path):
+    """:return: {产物文件名: 修改时间纳秒}，只包含存在的产物。"""
+    artifacts = {}
+    for name in BUILD_ARTIFACTS:
+        artifact_signature = file_signature(os.path.join(project_path, name))
+        if artifact_signature is not None:
+            artifacts[name] = artifact_signature[1]
+    return artifacts
+
+
+def _stored_signature(entry, key):
+    signature = entry.get(key)
+    return tuple(signature) if signature is not None else None
+
+
+def detect_changes(project_path, entry):
+    """
+    只用几次 stat 判断条目是否与磁盘上的文件一致 (例如手动编辑了 graph.yaml 或删除了产物)。
+    :return: 'graph' - graph.yaml 的大小或修改时间变了，节点/边数需要重新统计；
+             'files' - 只有编辑日志或生成产物变了，刷新时间戳即可；
+             None - 条目仍然有效。
+    """
+    if file_signature(os.path.join(project_path, 'graph.yaml')) != _stored_signature(entry, 'graph_signature'):
+        return 'graph'
+    if file_signature(os.path.join(project_path, JOURNAL_FILE_NAME)) != _stored_signature(entry, 'journal_signature'):
+        return 'files'
+    if _artifact_mtimes(project_path) != (entry.get('artifacts') or {}):
+        return 'files'
+    return None
+
+
+def describe_project(project_path, previous=None, nodes=None, edges=None):
+    """
+    只通过 stat (必要时再对 graph.yaml 求摘要) 生成工程的目录条目，不加载图。
+    :param previous: 该工程已有的条目；graph.yaml 大小与修改时间未变时沿用其中的摘要，
+                     未给出 nodes/edges 时沿用其中的计数。
+    :param nodes: 节点数 (调用方刚加载过图或刚导入时提供)。
+    :param edges: 边数。
+    :return: 可 JSON 序列化的条目字典。
+    """
+    previous = previous or {}
+    relations_file = os.path.join(project_path, 'graph.yaml')
+    signature = file_signature(relations_file)
+    if signature is not None and signature == tuple(previous.get('graph_signature') or ()):
+        graph_hash = previous.get('graph_hash')
+    else:
+        graph_hash = file_digest(relations_file)
+
+    journal_signature = file_signature(os.path.join(project_path, JOURNAL_FILE_NAME))
+    source_mtimes = [sig[1] for sig in (signature, journal_signature) if sig is not None]
+    artifacts = _artifact_mtimes(project_path)
+
+    return {
+        'name': os.path.basename(os.path.normpath(project_path)),
+        'nodes': nodes if nodes is not None else previous.get('nodes'),
+        'edges': edges if edges is not None else previous.get('edges'),
+        'graph_hash': graph_hash,
+        'graph_signature': list(signature) if signature is not None else None,
+        'journal_signature': list(journal_signature) if journal_signature is not None else None,
+        'source_mtime_ns': max(source_mtimes) if source_mtimes else None,
+        'artifacts': artifacts,
+        'built_at': max(artifacts.values()) / 1e9 if artifacts else None,
+        'indexed_at': time.time(),
+    }
+
+
+def is_stale(entry):
+    """根据条目判断生成产物是否过期：缺少任一产物，或产物早于 graph.yaml / 编辑日志的最后修改。"""
+    artifacts = entry.get('artifacts') or {}
+    if any(name not in artifacts for name in BUILD_ARTIFACTS):
+        return True
+    source_mtime = entry.get('source_mtime_ns')
+    return source_mtime is not None and min(artifacts.values()) < source_mtime
+
+
+def scan_project(project_path, settings=None, previous=None):
+    """
+    加载工程 (优先使用图缓存) 以统计节点/边数，并生成目录条目。
+    供 reindex 在工作进程中调用，加载过程中的提示信息被丢弃。
+    """
+    project = SkillTreeProject(project_path, config=settings)
+    with redirect_stdout(io.StringIO()):
+        project.load_relations()
+    graph = project.graph
+    return describe_project(
+        project_path, previous,
+        nodes=graph.number_of_nodes() if graph is not None else 0,
+        edges=graph.number_of_edges() if graph is not None else 0,
+    )
+
+
+def sort_entries(entries, sort_key='name'):
+    """
+    排序工程条目列表。name 按名称；size 按节点+边数降序；built 按最近构建时间降序。
+    未知的计数或从未构建的工程排在最后。
+    """
+    if sort_key == 'size':
+        return sorted(entries, key=lambda e: (-((e.get('nodes') or 0) + (e.get('edges') or 0)), e['name']))
+    if sort_key == 'built':
+        return sorted(entries, key=lambda e: (-(e.get('built_at') or 0), e['name']))
+    return sorted(entries, key=lambda e: e['name'])
+
+
+class ProjectCatalog:
+    """
+    工程根目录下的工程目录文件 (.catalog.json)，记录每个工程的节点/边数、
+    graph.yaml 摘要、产物时间戳等，使 list 无需打开每个工程。
+    所有写入都持有 .catalog.lock 并以原子替换的方式落盘。
+    """
+    def __init__(self, projects_dir):
+        self.projects_dir = projects_dir
+        self.catalog_file = os.path.join(projects_dir, CATALOG_FILE_NAME)
+        self.lock_file = os.path.join(projects_dir, CATALOG_LOCK_FILE_NAME)
+
+    def exists(self):
+        return os.path.exists(self.catalog_file)
+
+    def load(self):
+        """:return: {工程名: 条目}；文件不存在或已损坏时返回空字典。"""
+        try:
+            with open(self.catalog_file, 'r', encoding='utf-8') as f:
+                payload = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            print(f"警告: 无法读取工程目录文件 '{self.catalog_file}': {e}")
+            return {}
+        if payload.get('version') != CATALOG_VERSION:
+            return {}
+        return payload.get('projects', {})
+
+    def _write(self, entries):
+        tmp_file = self.catalog_file + '.tmp'
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({'version': CATALOG_VERSION, 'projects': entries}, f, ensure_ascii=False, indent=1, sort_keys=True)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.catalog_file)
+
+    def update(self, project_path, nodes=None, edges=None):
+        """
+        刷新单个工程的条目 (读-改-写，全程持有目录锁)。
+        写入失败只给出警告：目录只是加速用的索引，不应影响主流程。
+        """
+        name = os.path.basename(os.path.normpath(project_path))
+        try:
+            with file_lock(self.lock_file):
+                entries = self.load()
+                entries[name] = describe_project(project_path, entries.get(name), nodes=nodes, edges=edges)
+                self._write(entries)
+        except OSError as e:
+            print(f"警告: 更新工程目录文件 '{self.catalog_file}' 失败: {e}")
+
+    def merge(self, entries):
+        """
+        将给定的条目并入目录 (读-改-写，全程持有目录锁)，其余工程的条目保持不变。
+        写入失败只给出警告，与 update 相同。
+        """
+        try:
+            with file_lock(self.lock_file):
+                merged = self.load()
+                merged.update(entries)
+                self._write(merged)
+        except OSError as e:
+            print(f"警告: 更新工程目录文件 '{self.catalog_file}' 失败: {e}")
+
+    def replace(self, entries):
+        """用给定的条目整体替换目录内容。"""
+        with file_lock(self.lock_file):
+            self._write(entries)
@@ -0,0 +1,261 @@
+import hashlib
+import json
+import os
+import random
+from array import array
+
+# 缓存格式版本，算法或参数含义变化时递增
+COMMUNITY_CACHE_VERSION = 1
+DEFAULT_MAX_LEVELS = 3
+DEFAULT_MAX_ITERATIONS = 20
+DEFAULT_SEED = 42
+REPRESENTATIVES_PER_COMMUNITY = 3
+
+# 按社区规模排名着色，超出调色板的小社区统一为灰色
+COMMUNITY_PALETTE = [
+    '#E6194B', '#3CB44B', '#FFE119', '#4363D8', '#F58231', '#911EB4',
+    '#46F0F0', '#F032E6', '#BCF60C', '#FABEBE', '#008080', '#E6BEFF',
+]
+SMALL_COMMUNITY_COLOR = '#888888'
+
+
+def graph_structure_hash(graph):
+    """
+    计算图结构 (节点集合与边集合) 的内容摘要，与节点/边的插入顺序无关。
+    对每个元素单独求摘要后按 2^128 取模求和，整体为线性复杂度。
+    """
+    modulus = 1 << 128
+    node_sum = 0
+    for node_id in graph.nodes():
+        digest = hashlib.blake2b(repr(node_id).encode('utf-8'), digest_size=16).digest()
+        node_sum = (node_sum + int.from_bytes(digest, 'big')) % modulus
+    edge_sum = 0
+    for u, v in graph.edges():
+        digest = hashlib.blake2b(f"{u!r}\x00{v!r}".encode('utf-8'), digest_size=16).digest()
+        edge_sum = (edge_sum + int.from_bytes(digest, 'big')) % modulus
+    return f"{graph.number_of_nodes()}-{graph.number_of_edges()}-{node_sum:032x}-{edge_sum:032x}"
+
+
+class CSRAdjacency:
+    """
+    无向视图的压缩稀疏行 (CSR) 邻接表：
+    neighbors[offsets[i]:offsets[i + 1]] 为节点 i 的邻居下标，weights 为对应边权。
+    """
+    __slots__ = ('size', 'offsets', 'neighbors', 'weights')
+
+    def __init__(self, size, edges):
+        """
+        :param size: 节点数，节点用 0..size-1 表示。
+        :param edges: 可迭代的 (i, j, weight)，自环会被忽略，(i, j) 与 (j, i) 视为同一无向边并累加权重。
+        """
+        self.size = size
+        merged = {}
+        for i, j, weight in edges:
+            if i == j:
+                continue
+            key = (i, j) if i < j else (j, i)
+            merged[key] = merged.get(key, 0) + weight
+
+        degree = array('l', [0]) * size
+        for i, j in merged:
+            degree[i] += 1
+            degree[j] += 1
+        offsets = array('l', [0]) * (size + 1)
+        for i in range(size):
+            offsets[i + 1] = offsets[i] + degree[i]
+        cursor = array('l', offsets[:size])
+        neighbors = array('l', [0]) * offsets[size]
+        weights = array('d', [0.0]) * offsets[size]
+        for (i, j), weight in merged.items():
+            neighbors[cursor[i]] = j
+            weights[cursor[i]] = weight
+            cursor[i] += 1
+            neighbors[cursor[j]] = i
+            weights[cursor[j]] = weight
+            cursor[j] += 1
+        self.offsets = offsets
+        self.neighbors = neighbors
+        self.weights = weights
+
+    @classmethod
+    def from_graph(cls, graph):
+        """由 networkx 图构建，返回 (CSRAdjacency, 节点列表)，节点列表下标即 CSR 中的编号。"""
+        nodes = list(graph.nodes())
+        index = {node_id: i for i, node_id in enumerate(nodes)}
+        return cls(len(nodes), ((index[u], index[v], 1.0) for u, v in graph.edges())), nodes
+
+    def degree(self, i):
+        return self.offsets[i + 1] - self.offsets[i]
+
+
+def label_propagation(adjacency, max_iterations=DEFAULT_MAX_ITERATIONS, seed=DEFAULT_SEED):
+    """
+    带权异步标签传播。每轮按随机顺序访问节点，将其标签更新为邻居中权重和最大的标签；
+    平局时保留当前标签，否则取编号最小者，因此给定 seed 时结果确定。
+    :return: array('l')，labels[i] 为节点 i 的社区编号 (0..k-1，按首次出现顺序重新编号)。
+    """
+    size = adjacency.size
+    labels = array('l', range(size))
+    offsets, neighbors, weights = adjacency.offsets, adjacency.neighbors, adjacency.weights
+    order = list(range(size))
+    rng = random.Random(seed)
+
+    for _ in range(max_iterations):
+        rng.shuffle(order)
+        changed = 0
+        for i in order:
+            start, end = offsets[i], offsets[i + 1]
+            if start == end:
+                continue
+            scores = {}
+            for k in range(start, end):
+                label = labels[neighbors[k]]
+                scores[label] = scores.get(label, 0.0) + weights[k]
+            best_score = max(scores.values())
+            current = labels[i]
+            if scores.get(current) == best_score:
+                continue
+            best = min(label for label, score in scores.items() if score == best_score)
+            labels[i] = best
+            changed += 1
+        if not changed:
+            break
+
+    renumber = {}
+    for i in range(size):
+        labels[i] = renumber.setdefault(labels[i], len(renumber))
+    return labels
+
+
+def _aggregate(adjacency, labels, community_count):
+    """将同一社区的节点合并，返回社区之间的加权 CSR 邻接 (社区内部边被丢弃)。"""
+    offsets, neighbors, weights = adjacency.offsets, adjacency.neighbors, adjacency.weights
+
+    def inter_edges():
+        for i in range(adjacency.size):
+            for k in range(offsets[i], offsets[i + 1]):
+                j = neighbors[k]
+                if i < j and labels[i] != labels[j]:
+                    yield labels[i], labels[j], weights[k]
+
+    return CSRAdjacency(community_count, inter_edges())
+
+
+def _summarize_level(adjacency, member_labels, community_count, node_ids, node_degree, top_pairs=10):
+    """
+    生成某一层的摘要。
+    :param adjacency: 该层划分所基于的 (未聚合的) 节点级 CSR。
+    :param member_labels: 每个原始节点在该层所属的社区编号。
+    """
+    sizes = [0] * community_count
+    members = [[] for _ in range(community_count)]
+    for i, label in enumerate(member_labels):
+        sizes[label] += 1
+        members[label].append(i)
+
+    pair_counts = {}
+    offsets, neighbors = adjacency.offsets, adjacency.neighbors
+    for i in range(adjacency.size):
+        for k in range(offsets[i], offsets[i + 1]):
+            j = neighbors[k]
+            a, b = member_labels[i], member_labels[j]
+            if i < j and a != b:
+                key = (a, b) if a < b else (b, a)
+                pair_counts[key] = pair_counts.get(key, 0) + 1
+
+    # 按规模降序重新编号，使编号 0 总是最大的社区
+    ranking = sorted(range(community_count), key=lambda c: (-sizes[c], c))
+    rank_of = {c: rank for rank, c in enumerate(ranking)}
+    communities = []
+    for c in ranking:
+        top = sorted(members[c], key=lambda i: (-node_degree[i], str(node_ids[i])))[:REPRESENTATIVES_PER_COMMUNITY]
+        communities.append({
+            'id': rank_of[c],
+            'size': sizes[c],
+            'representatives': [node_ids[i] for i in top],
+        })
+    inter = sorted(((rank_of[a], rank_of[b], count) for (a, b), count in pair_counts.items()),
+                   key=lambda item: (-item[2], item[0], item[1]))
+    return {
+        'community_count': community_count,
+        'communities': communities,
+        'inter_community_edges': sum(pair_counts.values()),
+        'top_inter_community_links': [{'source': a, 'target': b, 'edges': count} for a, b, count in inter[:top_pairs]],
+    }, [rank_of[label] for label in member_labels]
+
+
+def detect_communities(graph, max_levels=DEFAULT_MAX_LEVELS, max_iterations=DEFAULT_MAX_ITERATIONS, seed=DEFAULT_SEED):
+    """
+    在图的无向视图上进行多层社区检测：
+    第 0 层对原始节点做标签传播；之后每层把上一层的社区合并为超级节点，
+    以社区间边数为权重再次传播，直到社区数不再减少或达到 max_levels。
+    :return: (assignments, summary)
+        assignments: {node_id: [第0层社区, 第1层社区, ...]}，社区编号按规模降序；
+        summary: {'levels': [每层摘要...]}，可直接 JSON 序列化。
+    """
+    adjacency, node_ids = CSRAdjacency.from_graph(graph)
+    node_degree = [adjacency.degree(i) for i in range(adjacency.size)]
+    per_node_levels = [[] for _ in node_ids]
+    levels = []
+
+    current_adjacency = adjacency
+    member_labels = list(range(adjacency.size)) # 原始节点 -> 当前层超级节点
+    previous_count = adjacency.size
+    for _ in range(max_levels):
+        labels = label_propagation(current_adjacency, max_iterations=max_iterations, seed=seed)
+        community_count = (max(labels) + 1) if len(labels) else 0
+        if levels and community_count >= previous_count:
+            break
+        member_labels = [labels[s] for s in member_labels]
+        level_summary, ranked = _summarize_level(adjacency, member_labels, community_count, node_ids, node_degree)
+        levels.append(level_summary)
+        for i, label in enumerate(ranked):
+            per_node_levels[i].append(label)
+        if community_count <= 1:
+            break
+        previous_count = community_count
+        current_adjacency = _aggregate(current_adjacency, labels, community_count)
+
+    assignments = {node_id: per_node_levels[i] for i, node_id in enumerate(node_ids)}
+    return assignments, {'levels': levels}
+
+
+def load_community_cache(cache_file, structure_hash, params):
+    """读取社区缓存；结构摘要或参数不匹配时返回 None。"""
+    if not os.path.exists(cache_file):
+        return None
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            payload = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if (payload.get('version') != COMMUNITY_CACHE_VERSION or payload.get('hash') != structure_hash
+            or payload.get('params') != params):
+        return None
+    # JSON 不保留非字符串的键类型，因此 assignments 以 [node_id, levels] 列表保存
+    return {node_id: levels for node_id, levels in payload['assignments']}, payload['summary']
+
+
+def save_community_cache(cache_file, structure_hash, params, assignments, summary):
+    """将社区检测结果写入缓存 (原子替换)。"""
+    tmp_file = cache_file + '.tmp'
+    payload = {
+        'version': COMMUNITY_CACHE_VERSION,
+        'hash': structure_hash,
+        'params': params,
+        'assignments': [[node_id, levels] for node_id, levels in assignments.items()],
+        'summary': summary,
+    }
+    try:
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, ensure_ascii=False, default=str)
+        os.replace(tmp_file, cache_file)
+    except OSError as e:
+        print(f"警告: 写入社区缓存 '{cache_file}' 失败: {e}")
+
+
+def community_color(community_id):
+    """按社区编号 (规模排名) 返回显示颜色。"""
+    if community_id is None or community_id >= len(COMMUNITY_PALETTE):
+        return SMALL_COMMUNITY_COLOR
+    return COMMUNITY_PALETTE[community_id]
@@ -1,25 +1,174 @@
 import networkx as nx
 from pyvis.network import Network
 import os
+import time
 import yaml # 导入 PyYAML 库
 
+from .attr_store import CompactDiGraph
+from .binary_graph import BinaryGraph
+from .community import (detect_communities, graph_structure_hash, load_community_cache, save_community_cache,
+                        community_color, DEFAULT_MAX_LEVELS, DEFAULT_MAX_ITERATIONS, DEFAULT_SEED)
+from .journal import ProjectJournal
+from .positions import load_positions, save_positions, neighbourhood_signatures, POSITIONS_FILE_NAME
+from .records import normalize_node_record, normalize_edge_record
+from .storage import load_graph_cache, save_graph_cache, write_graph_yaml, YAML_LOADER
+
+
+# pyvis 网络的显示与物理引擎选项，交互式图谱与差异图谱共用
+PYVIS_OPTIONS = """
+var options = {
+  "nodes": {
+    "borderWidth": 1,
+    "borderWidthSelected": 2,
+    "shadow": {
+      "enabled": true
+    }
+  },
+  "edges": {
+    "arrows": {
+      "to": {
+        "enabled": true,
+        "scaleFactor": 0.8
+      }
+    },
+    "font": {
+      "size": 10
+    },
+    "smooth": {
+      "enabled": true,
+      "type": "dynamic"
+    }
+  },
+  "physics": {
+    "forceAtlas2Based": {
+      "gravitationalConstant": -50,
+      "centralGravity": 0.005,
+      "springLength": 100,
+      "springConstant": 0.18
+    },
+    "maxVelocity": 146,
+    "solver": "forceAtlas2Based",
+    "timestep": 0.35,
+    "stabilization": {
+      "enabled": true,
+      "iterations": 2000,
+      "updateInterval": 25
+    }
+  },
+  "interaction": {
+    "navigationButtons": true,
+    "zoomView": true
+  }
+}
+"""
+
+# 已有保存的节点坐标时使用的稳定化迭代次数：已知节点固定，只有新节点需要物理模拟
+WARM_START_STABILIZATION_ITERATIONS = 200
+
+# 注入到 skill_tree.html 末尾的脚本：布局稳定后以及拖动节点后，
+# 把全部节点坐标回传给本地服务器 (open 的静态服务器或 serve)，保存为 positions.json。
+# 以 file:// 直接打开时请求会失败，静默忽略即可。
+POSITIONS_SYNC_SCRIPT = """
+<script type="text/javascript">
+  (function () {
+    function savePositions() {
+      fetch("/api/positions", {
+        method: "POST",
+        headers: {"Content-Type": "application/json"},
+        body: JSON.stringify({positions: network.getPositions()})
+      }).catch(function () {});
+    }
+    network.on("stabilizationIterationsDone", savePositions);
+    network.on("dragEnd", function (params) {
+      if (params.nodes.length) { savePositions(); }
+    });
+  })();
+</script>
+"""
+
+
+def new_pyvis_network():
+    """创建统一外观 (深色背景、有向、启用物理引擎) 的 pyvis 网络。"""
+    net = Network(notebook=False, directed=True, height="750px", width="100%", bgcolor="#222222", font_color="white", cdn_resources='remote')
+    net.toggle_physics(True)
+    return net
+
+
+def node_visual_style(graph, node_id, attrs):
+    """
+    计算节点的显示样式 (标签、悬停提示、颜色、大小)。
+    颜色由 level 决定，大小随入度增长；所有渲染器共用这套规则。
+    """
+    node_label = attrs.get('label', node_id).replace('_', ' ')
+
+    node_size = 10 + graph.in_degree(node_id) * 5
+    if node_size > 50: node_size = 50
+
+    color = 'skyblue'
+    if attrs.get('level') == 'foundational':
+        color = '#FF5733'
+        node_size = max(node_size, 40)
+    elif attrs.get('level') == 'intermediate':
+        color = '#33FF57'
+
+    node_title = f"Concept: {node_label}"
+    if 'description' in attrs:
+        node_title += f"\nDescription: {attrs['description']}"
+    if 'tags' in attrs:
+        # pyvis 对字符串和列表通常都兼容，但如果 tags 已经被转为字符串，这里直接用
+        if isinstance(attrs['tags'], list):
+            node_title += f"\nTags: {', '.join(map(str, attrs['tags']))}"
+        else: # 已经是字符串或非列表类型
+            node_title += f"\nTags: {attrs['tags']}"
+
+    return {'label': node_label, 'title': node_title, 'color': color, 'size': node_size}
+
+
+def edge_visual_style(attrs):
+    """计算边的显示样式 (颜色、悬停提示)，颜色由关系 type 决定。"""
+    edge_color = 'gray'
+    if attrs.get('type') == 'DEPENDS_ON':
+        edge_color = 'orange'
+    elif attrs.get('type') == 'HAS_SUBFIELD':
+        edge_color = 'lightblue'
+
+    edge_title = f"Relationship: {attrs.get('type', 'Generic')}"
+    if 'notes' in attrs:
+        edge_title += f"\nNotes: {attrs['notes']}"
+
+    return {'color': edge_color, 'title': edge_title}
+
+
 class SkillTreeProject:
     """
     封装单个知识树工程的所有操作和数据。
     每个工程有自己的知识关系文件、HTML输出和GEXF输出。
     """
-    def __init__(self, project_path, config=None, lang_strings=None):
+    def __init__(self, project_path, config=None, lang_strings=None, relations_file=None):
         """
         初始化一个知识树工程实例。
         :param project_path: 该工程的根目录路径。
         :param config: 全局配置字典。
         :param lang_strings: 语言字符串字典。
+        :param relations_file: 可选，直接指定要加载的 YAML 文件 (此时不使用图缓存)。
         """
         self.project_path = project_path
-        self.relations_file = os.path.join(project_path, 'graph.yaml') # 改为 YAML 文件
+        self.relations_file = relations_file or os.path.join(project_path, 'graph.yaml') # 改为 YAML 文件
         self.html_export_file = os.path.join(project_path, 'skill_tree.html') # 统一命名
         self.gexf_export_file = os.path.join(project_path, 'skill_tree.gexf') # 统一命名
+        self.svg_export_file = os.path.join(project_path, 'skill_tree.svg')
+        # 已构建图的缓存，随 graph.yaml 变化自动失效
+        self.cache_file = None if relations_file else os.path.join(project_path, '.graph_cache.pickle')
+        # 追加式编辑日志，仅工程自身的 graph.yaml 才有
+        self.journal = None if relations_file else ProjectJournal(project_path)
+        # 社区检测结果的缓存，以图结构摘要为键
+        self.community_cache_file = None if relations_file else os.path.join(project_path, '.community_cache.json')
+        # 上次布局的节点坐标，重新生成 HTML / SVG 时用于热启动
+        self.positions_file = None if relations_file else os.path.join(project_path, POSITIONS_FILE_NAME)
         self.graph = None # 用于存储 networkx 图对象
+        self.journal_applied = 0 # 上次 load_relations 时实际生效的日志操作数
+        self.communities = None # {node_id: [第0层社区, 第1层社区, ...]}，调用 detect_communities 后可用
+        self.community_summary = None
         self.config = config if config is not None else {}
         self.lang = lang_strings if lang_strings is not None else {}
 
@@ -36,9 +185,19 @@ class SkillTreeProject:
             return value.format(**kwargs)
         return value 
 
+    def new_graph(self):
+        """
+        创建一个空的有向图。默认使用属性紧凑存储的 CompactDiGraph，
+        可通过配置 compact_attributes: false 回退到普通 nx.DiGraph。
+        """
+        if self.config.get('compact_attributes', True):
+            return CompactDiGraph()
+        return nx.DiGraph()
+
     def load_relations(self):
         """
-        从工程的知识关系YAML文件中加载关系。
+        从工程的知识关系YAML文件 (或其缓存) 中加载关系，
+        然后在其上重放编辑日志 graph.journal.jsonl 中尚未 compact 的操作。
         预期YAML结构：
         nodes:
           - id: ConceptA
@@ -50,15 +209,55 @@ class SkillTreeProject:
             type: DEPENDS_ON
             # ... other edge attributes
         """
+        load_success = self._load_base_relations()
+        self.journal_applied = 0
+        if self.graph is None or self.journal is None or not self.journal.exists():
+            return load_success
+
+        applied = self.journal_applied = self.journal.replay(self.graph)
+        print(self._t('skill_tree_project.TXT_JOURNAL_REPLAYED', count=applied, file_path=self.journal.journal_file))
+        return bool(self.graph.nodes())
+
+    def load_binary(self, binary_file):
+        """
+        从 export --format binary 生成的二进制文件加载图谱 (代替 graph.yaml 与编辑日志)。
+        文件以 mmap 打开，数组不经复制直接读取。
+        :return: 加载成功且图中有节点时返回 True。
+        """
+        start = time.perf_counter()
+        try:
+            with BinaryGraph(binary_file) as binary_graph:
+                self.graph = binary_graph.to_graph(self.new_graph())
+        except (OSError, ValueError) as e:
+            print(self._t('skill_tree_project.TXT_ERROR_LOADING_BINARY', file_path=binary_file, error_message=e))
+            return False
+        print(self._t('skill_tree_project.TXT_LOADED_FROM_BINARY', file_path=binary_file,
+                      nodes=self.graph.number_of_nodes(), edges=self.graph.number_of_edges(),
+                      milliseconds=(time.perf_counter() - start) * 1000))
+        return bool(self.graph.nodes())
+
+    def _load_base_relations(self):
+        """从 graph.yaml 或图缓存加载基础图，不包含编辑日志。"""
         print(self._t('skill_tree_project.TXT_LOADING_RELATIONS_FILE', file_path=self.relations_file))
 
         if not os.path.exists(self.relations_file):
             print(self._t('skill_tree_project.TXT_ERROR_RELATIONS_FILE_NOT_FOUND', file_path=self.relations_file))
             return False # 返回 False 表示加载失败
 
+        use_cache = self.config.get('use_graph_cache', True) and self.cache_file is not None
+        if use_cache:
+            cached_graph = load_graph_cache(self.cache_file, self.relations_file)
+            if cached_graph is not None:
+                print(self._t('skill_tree_project.TXT_LOADED_FROM_CACHE', file_path=self.cache_file))
+                self.graph = cached_graph
+                if not cached_graph.nodes():
+                    print(self._t('skill_tree_project.TXT_WARNING_NO_VALID_RELATIONS', file_path=self.relations_file))
+                    return False
+                return True
+
         try:
             with open(self.relations_file, 'r', encoding='utf-8') as f:
-                data = yaml.safe_load(f)
+                data = yaml.load(f, Loader=YAML_LOADER)
                 if data is None: 
                     print(self._t('skill_tree_project.TXT_WARNING_NO_VALID_RELATIONS', file_path=self.relations_file))
                     self.graph = nx.DiGraph() # 创建一个空图以防止后续操作报错
@@ -67,54 +266,25 @@ class SkillTreeProject:
                 nodes_data = data.get('nodes', [])
                 edges_data = data.get('edges', [])
 
-                G = nx.DiGraph()
+                G = self.new_graph()
 
                 for node_info in nodes_data:
-                    node_id = node_info.get('id')
-                    if not node_id: # 确保id存在
-                        print(f"警告: 节点定义缺少 'id' 字段：{node_info}，已跳过此节点。")
+                    normalized = normalize_node_record(node_info)
+                    if normalized is None:
                         continue
-                        
-                    node_label = node_info.get('label', node_id).replace('_', ' ')
-                    
-                    attrs_to_add = {k: v for k, v in node_info.items() if k not in ['id', 'label']}
-                    
-                    # --- GEXF 兼容性修复 (tags 列表转字符串) ---
-                    if 'tags' in attrs_to_add and isinstance(attrs_to_add['tags'], list):
-                        attrs_to_add['tags'] = ",".join(map(str, attrs_to_add['tags'])) # Convert list to comma-separated string
-                    # ----------------------------------------
-                    
-                    G.add_node(node_id, label=node_label, **attrs_to_add)
+                    node_id, attrs_to_add = normalized
+                    G.add_node(node_id, **attrs_to_add)
 
                 for edge_info in edges_data:
-                    source_id = edge_info.get('source')
-                    target_id = edge_info.get('target')
-                    if not source_id or not target_id:
-                        print(f"警告: 边定义格式不正确，缺少 'source' 或 'target' 字段：{edge_info}，已跳过此边。")
-                        continue
-
-                    # 确保源和目标节点存在，避免 Key Error
-                    if source_id not in G:
-                        print(f"警告: 边 '{source_id} -> {target_id}' 的源节点 '{source_id}' 未定义在 'nodes' 部分，已跳过此边。")
-                        continue
-                    if target_id not in G:
-                        print(f"警告: 边 '{source_id} -> {target_id}' 的目标节点 '{target_id}' 未定义在 'nodes' 部分，已跳过此边。")
+                    normalized = normalize_edge_record(edge_info, G)
+                    if normalized is None:
                         continue
-                    
-                    attrs_to_add_edge = {k: v for k, v in edge_info.items() if k not in ['source', 'target']}
-                    
-                    # --- GEXF 兼容性修复 (strength 强制转换为 float) ---
-                    if 'strength' in attrs_to_add_edge:
-                        try:
-                            attrs_to_add_edge['strength'] = float(attrs_to_add_edge['strength'])
-                        except (ValueError, TypeError):
-                            print(f"警告: 边 '{source_id} -> {target_id}' 的 'strength' 属性值 '{attrs_to_add_edge['strength']}' 无法转换为数字，将跳过此属性。")
-                            del attrs_to_add_edge['strength'] # Remove if conversion fails
-                    # --------------------------------------------------
-
+                    source_id, target_id, attrs_to_add_edge = normalized
                     G.add_edge(source_id, target_id, **attrs_to_add_edge)
 
                 self.graph = G 
+                if use_cache:
+                    save_graph_cache(G, self.cache_file, self.relations_file)
                 
                 if not G.nodes():
                     print(self._t('skill_tree_project.TXT_WARNING_NO_VALID_RELATIONS', file_path=self.relations_file))
@@ -128,6 +298,28 @@ class SkillTreeProject:
             print(self._t('skill_tree_project.TXT_ERROR_READING_FILE', file_path=self.relations_file, error_message=e))
             return False
 
+    def compact_journal(self):
+        """
+        将编辑日志折叠回 graph.yaml：加载基础图并重放日志，原子替换 graph.yaml，
+        刷新图缓存，最后清空日志。整个过程持有工程锁，期间其他写入者会等待。
+        即使在替换 graph.yaml 之后、清空日志之前崩溃，日志重放也是幂等的，不会破坏数据。
+        :return: (折叠的操作数, 未生效而被丢弃的操作数)；加载失败时返回 None。
+                 未生效的操作包括端点不存在的边、删除不存在的元素等，它们不会写入 graph.yaml。
+        """
+        if self.journal is None:
+            return None
+        with self.journal.lock():
+            pending = sum(1 for _ in self.journal.read_ops())
+            if not self.load_relations() and self.graph is None:
+                return None
+            folded = self.journal_applied
+            write_graph_yaml(self.graph, self.relations_file,
+                             header="# graph.yaml\n# Compacted from the edit journal.\n")
+            if self.config.get('use_graph_cache', True):
+                save_graph_cache(self.graph, self.cache_file, self.relations_file)
+            self.journal.clear()
+        return folded, pending - folded
+
     def build_graph(self, relations_data=None):
         """
         这个函数现在主要是为了兼容之前的调用，实际的图构建逻辑已集成到 load_relations 中。
@@ -152,96 +344,49 @@ class SkillTreeProject:
             print(self._t('skill_tree_project.TXT_NO_NODES_FOR_VIZ'))
             return
 
-        net = Network(notebook=False, directed=True, height="750px", width="100%", bgcolor="#222222", font_color="white", cdn_resources='remote')
-        net.toggle_physics(True)
+        net = new_pyvis_network()
+        # 只复用邻域未变的节点坐标；同时记下本次的邻域签名，页面回传坐标时沿用
+        positions = load_positions(self.positions_file, self.graph)
+        if self.positions_file is not None:
+            try:
+                save_positions(self.positions_file, positions, neighbourhood_signatures(self.graph))
+            except OSError as e:
+                print(f"警告: 无法保存节点坐标到 '{self.positions_file}': {e}")
+        known_count = 0
 
         for node_id, attrs in self.graph.nodes(data=True):
-            node_label = attrs.get('label', node_id).replace('_', ' ')
-
-            node_size = 10 + self.graph.in_degree(node_id) * 5
-            if node_size > 50: node_size = 50
-
-            color = 'skyblue'
-            if attrs.get('level') == 'foundational':
-                color = '#FF5733'
-                node_size = max(node_size, 40)
-            elif attrs.get('level') == 'intermediate':
-                color = '#33FF57'
-            
-            node_title = f"Concept: {node_label}"
-            if 'description' in attrs:
-                node_title += f"\nDescription: {attrs['description']}"
-            if 'tags' in attrs:
-                # pyvis 对字符串和列表通常都兼容，但如果 tags 已经被转为字符串，这里直接用
-                if isinstance(attrs['tags'], list):
-                    node_title += f"\nTags: {', '.join(map(str, attrs['tags']))}"
-                else: # 已经是字符串或非列表类型
-                    node_title += f"\nTags: {attrs['tags']}"
-            
-            net.add_node(node_id, label=node_label, title=node_title, color=color, size=node_size)
+            style = node_visual_style(self.graph, node_id, attrs)
+            if self.communities is not None:
+                # 已进行社区检测时按第 0 层社区着色
+                community_id = self.communities.get(node_id, [None])[0]
+                style['color'] = community_color(community_id)
+                style['title'] += f"\nCommunity: {community_id}"
+            xy = positions.get(str(node_id))
+            if xy is not None:
+                # 已知节点放回上次的位置并固定，页面只需为新节点做物理模拟
+                known_count += 1
+                net.add_node(node_id, label=style['label'], title=style['title'], color=style['color'], size=style['size'],
+                             x=xy[0], y=xy[1], physics=False)
+            else:
+                net.add_node(node_id, label=style['label'], title=style['title'], color=style['color'], size=style['size'])
 
         for source, target, attrs in self.graph.edges(data=True):
-            edge_color = 'gray'
-            if attrs.get('type') == 'DEPENDS_ON':
-                edge_color = 'orange'
-            elif attrs.get('type') == 'HAS_SUBFIELD':
-                edge_color = 'lightblue'
-
-            edge_title = f"Relationship: {attrs.get('type', 'Generic')}"
-            if 'notes' in attrs:
-                edge_title += f"\nNotes: {attrs['notes']}"
-            
+            style = edge_visual_style(attrs)
             # GEXF 兼容性修复中 strength 已经转为 float，pyvis 接受 float
-            net.add_edge(source, target, width=1.5, color=edge_color, title=edge_title)
-
-        net.set_options("""
-        var options = {
-          "nodes": {
-            "borderWidth": 1,
-            "borderWidthSelected": 2,
-            "shadow": {
-              "enabled": true
-            }
-          },
-          "edges": {
-            "arrows": {
-              "to": {
-                "enabled": true,
-                "scaleFactor": 0.8
-              }
-            },
-            "font": {
-              "size": 10
-            },
-            "smooth": {
-              "enabled": true,
-              "type": "dynamic"
-            }
-          },
-          "physics": {
-            "forceAtlas2Based": {
-              "gravitationalConstant": -50,
-              "centralGravity": 0.005,
-              "springLength": 100,
-              "springConstant": 0.18
-            },
-            "maxVelocity": 146,
-            "solver": "forceAtlas2Based",
-            "timestep": 0.35,
-            "stabilization": {
-              "enabled": true,
-              "iterations": 2000,
-              "updateInterval": 25
-            }
-          },
-          "interaction": {
-            "navigationButtons": true,
-            "zoomView": true
-          }
-        }
-        """)
+            net.add_edge(source, target, width=1.5, color=style['color'], title=style['title'])
+
+        net.set_options(PYVIS_OPTIONS)
+        if known_count:
+            net.options['physics']['stabilization']['iterations'] = WARM_START_STABILIZATION_ITERATIONS
+            print(self._t('skill_tree_project.TXT_POSITIONS_REUSED', count=known_count,
+                          total=self.graph.number_of_nodes(), file_path=self.positions_file))
 
         net.write_html(self.html_export_file, notebook=False)
+        if self.positions_file is not None:
+            with open(self.html_export_file, 'r', encoding='utf-8') as f:
+                html = f.read()
+            with open(self.html_export_file, 'w', encoding='utf-8') as f:
+                f.write(html.replace('</body>', POSITIONS_SYNC_SCRIPT + '</body>', 1))
         print(self._t('skill_tree_project.TXT_HTML_SAVED', file_path=self.html_export_file))
 
     def analyze_graph(self):
@@ -269,6 +414,55 @@ class SkillTreeProject:
         for node, degree in sorted_out_degree_items[:min(5, len(sorted_out_degree_items))]:
             print(f"- {node}: {self._t('skill_tree_project.TXT_OUT_DEGREE')} {degree}")
 
+    def detect_communities(self, max_levels=DEFAULT_MAX_LEVELS):
+        """
+        对当前图进行多层社区检测，结果保存在 self.communities / self.community_summary。
+        结果按图结构摘要缓存到 .community_cache.json，图结构未变化时直接复用。
+        :param max_levels: 最多计算的层数。
+        :return: 社区摘要字典；图未构建时返回 None。
+        """
+        if not self.graph:
+            print(self._t('skill_tree_project.TXT_GRAPH_NOT_BUILT_ANALYSIS'))
+            return None
+
+        params = {'max_levels': max_levels, 'max_iterations': DEFAULT_MAX_ITERATIONS, 'seed': DEFAULT_SEED}
+        structure_hash = graph_structure_hash(self.graph)
+        cached = None
+        if self.community_cache_file is not None:
+            cached = load_community_cache(self.community_cache_file, structure_hash, params)
+        # 非 JSON 原生类型的节点 id 在缓存中会变成字符串，此时重新计算
+        if cached is not None and all(node_id in cached[0] for node_id in self.graph):
+            print(self._t('skill_tree_project.TXT_COMMUNITIES_FROM_CACHE', file_path=self.community_cache_file))
+            self.communities, self.community_summary = cached
+        else:
+            start = time.perf_counter()
+            self.communities, self.community_summary = detect_communities(self.graph, max_levels=max_levels)
+            print(self._t('skill_tree_project.TXT_COMMUNITIES_DETECTED', seconds=time.perf_counter() - start))
+            if self.community_cache_file is not None:
+                save_community_cache(self.community_cache_file, structure_hash, params,
+                                     self.communities, self.community_summary)
+        return self.community_summary
+
+    def print_community_summary(self, max_communities=10):
+        """
+        打印各层社区摘要：社区数量、社区间边数、最大的若干社区及其代表节点、联系最紧密的社区对。
+        """
+        if not self.community_summary:
+            return
+        print(self._t('skill_tree_project.TXT_COMMUNITY_SUMMARY_HEADER'))
+        for level, summary in enumerate(self.community_summary['levels']):
+            print(self._t('skill_tree_project.TXT_COMMUNITY_LEVEL', level=level, count=summary['community_count'],
+                          inter_edges=summary['inter_community_edges']))
+            for community in summary['communities'][:max_communities]:
+                print(self._t('skill_tree_project.TXT_COMMUNITY_ENTRY', id=community['id'], size=community['size'],
+                              representatives=', '.join(map(str, community['representatives']))))
+            hidden = summary['community_count'] - max_communities
+            if hidden > 0:
+                print(self._t('skill_tree_project.TXT_COMMUNITY_MORE', count=hidden))
+            for link in summary['top_inter_community_links'][:5]:
+                print(self._t('skill_tree_project.TXT_COMMUNITY_LINK', source=link['source'],
+                              target=link['target'], edges=link['edges']))
+
     def interactive_lookup(self):
         """
         允许用户在终端输入概念名称，查询其前置和后续概念。
@@ -313,23 +507,45 @@ class SkillTreeProject:
             print(self._t('skill_tree_project.TXT_NO_NODES_FOR_GEXF'))
             return
         try:
-            nx.write_gexf(self.graph, self.gexf_export_file)
+            self.write_gexf(self.gexf_export_file)
             print(self._t('skill_tree_project.TXT_GEXF_EXPORTED', file_path=self.gexf_export_file))
         except Exception as e:
             print(self._t('skill_tree_project.TXT_ERROR_EXPORTING_GEXF', error_message=e))
 
-    def run_workflow(self, skip_vis=False, skip_analyze=False, skip_export_gexf=False, skip_query=False):
+    def write_gexf(self, output_file):
+        """
+        将图谱写为 GEXF 文件，出错时直接抛出异常 (供 export_gexf 与 export 命令共用)。
+        """
+        # 已进行社区检测时，在导出用的副本上加入 community (第 0 层) 与 community_l1、community_l2... 属性，
+        # 不修改 self.graph 中的节点属性 (用户自己的同名属性也保持不变)
+        graph = self.graph
+        if self.communities is not None:
+            levels = len(self.community_summary['levels']) if self.community_summary else 0
+            community_keys = ['community'] + [f'community_l{level}' for level in range(1, levels)]
+            graph = nx.DiGraph()
+            graph.graph.update(self.graph.graph)
+            graph.add_nodes_from(
+                (node_id, {**attrs, **dict(zip(community_keys, self.communities.get(node_id, [])))})
+                for node_id, attrs in self.graph.nodes(data=True)
+            )
+            graph.add_edges_from((source, target, dict(attrs)) for source, target, attrs in self.graph.edges(data=True))
+        nx.write_gexf(graph, output_file)
+
+    def run_workflow(self, skip_vis=False, skip_analyze=False, skip_export_gexf=False, skip_query=False, communities=False,
+                     binary_file=None):
         """
         为当前工程运行完整的知识图谱构建和分析流程。
         :param skip_vis: 是否跳过可视化。
         :param skip_analyze: 是否跳过分析。
         :param skip_export_gexf: 是否跳过GEXF导出。
         :param skip_query: 是否跳过交互式查询。
+        :param communities: 是否进行社区检测 (打印摘要、按社区着色并写入 GEXF)。
+        :param binary_file: 可选，从该二进制导出文件加载图谱，而不是 graph.yaml。
         """
         print(self._t('cli.TXT_OPENING_PROJECT', project_name=os.path.basename(self.project_path)))
         
         # load_relations 现在直接构建图，并返回是否成功
-        load_success = self.load_relations() 
+        load_success = self.load_binary(binary_file) if binary_file else self.load_relations()
         
         if not load_success or not self.graph or not self.graph.nodes():
             print(self._t('skill_tree_project.TXT_NO_RELATIONS_WORKFLOW_SKIPPED'))
@@ -337,8 +553,11 @@ class SkillTreeProject:
 
         print(self._t('skill_tree_project.TXT_BUILDING_GRAPH')) # 此时图已构建，此行仅作提示
 
+        if communities:
+            self.detect_communities()
         if not skip_analyze:
             self.analyze_graph()
+            self.print_community_summary()
         if not skip_export_gexf:
             self.export_gexf()
 
@@ -0,0 +1,176 @@
+import hashlib
+import json
+
+from .core import new_pyvis_network, node_visual_style, edge_visual_style, PYVIS_OPTIONS
+
+# 差异图谱中各状态的颜色 (新增/删除/修改/未变化)
+DIFF_COLORS = {
+    'added': '#2ECC71',
+    'removed': '#E74C3C',
+    'changed': '#F1C40F',
+    'unchanged': '#555555',
+}
+
+
+def attrs_digest(attrs):
+    """
+    计算属性字典的内容摘要。键排序后以 JSON 规范化，因此与属性的插入顺序无关。
+    无法 JSON 序列化的值按 str() 处理。
+    """
+    canonical = json.dumps(dict(attrs), sort_keys=True, ensure_ascii=False, default=str, separators=(',', ':'))
+    return hashlib.blake2b(canonical.encode('utf-8'), digest_size=16).digest()
+
+
+def attribute_changes(old_attrs, new_attrs):
+    """返回 {属性名: {'old': 旧值, 'new': 新值}}，缺失的一侧为 None。"""
+    changes = {}
+    for key in set(old_attrs) | set(new_attrs):
+        old_value = old_attrs.get(key)
+        new_value = new_attrs.get(key)
+        if key not in old_attrs or key not in new_attrs or old_value != new_value:
+            changes[key] = {'old': old_value, 'new': new_value}
+    return dict(sorted(changes.items()))
+
+
+def _diff_elements(old_items, new_items):
+    """
+    比较两组 {键: 属性} 映射。先对每个元素计算摘要，
+    只有摘要不同的公共元素才逐属性比较，整体为线性复杂度。
+    """
+    old_digests = {key: attrs_digest(attrs) for key, attrs in old_items.items()}
+    new_digests = {key: attrs_digest(attrs) for key, attrs in new_items.items()}
+
+    added = [key for key in new_digests if key not in old_digests]
+    removed = [key for key in old_digests if key not in new_digests]
+    changed = {}
+    for key, digest in new_digests.items():
+        old_digest = old_digests.get(key)
+        if old_digest is not None and old_digest != digest:
+            changed[key] = attribute_changes(old_items[key], new_items[key])
+    return added, removed, changed
+
+
+def diff_graphs(old_graph, new_graph):
+    """
+    对两个图做结构化差异比较，与节点/边在文件中的顺序无关。
+    :return: 可直接 JSON 序列化的差异字典：
+        {
+          'nodes': {'added': [...], 'removed': [...], 'changed': {id: {attr: {'old', 'new'}}}},
+          'edges': {'added': [[s, t], ...], 'removed': [...], 'changed': [{'source', 'target', 'changes'}]},
+          'summary': {...计数...}
+        }
+    """
+    node_added, node_removed, node_changed = _diff_elements(
+        dict(old_graph.nodes(data=True)), dict(new_graph.nodes(data=True)))
+    edge_added, edge_removed, edge_changed = _diff_elements(
+        {(u, v): d for u, v, d in old_graph.edges(data=True)},
+        {(u, v): d for u, v, d in new_graph.edges(data=True)})
+
+    result = {
+        'nodes': {
+            'added': sorted(node_added, key=str),
+            'removed': sorted(node_removed, key=str),
+            'changed': {key: node_changed[key] for key in sorted(node_changed, key=str)},
+        },
+        'edges': {
+            'added': [list(edge) for edge in sorted(edge_added, key=str)],
+            'removed': [list(edge) for edge in sorted(edge_removed, key=str)],
+            'changed': [{'source': u, 'target': v, 'changes': edge_changed[(u, v)]}
+                        for u, v in sorted(edge_changed, key=str)],
+        },
+    }
+    result['summary'] = {
+        'nodes_added': len(node_added),
+        'nodes_removed': len(node_removed),
+        'nodes_changed': len(node_changed),
+        'edges_added': len(edge_added),
+        'edges_removed': len(edge_removed),
+        'edges_changed': len(edge_changed),
+    }
+    return result
+
+
+def is_empty_diff(diff):
+    """两图完全一致时返回 True。"""
+    return not any(diff['summary'].values())
+
+
+def format_diff_text(diff):
+    """
+    生成人类可读的差异文本，逐行返回 (行内容, 状态) 元组，
+    状态为 'added' / 'removed' / 'changed' 或 None，方便调用方着色。
+    """
+    lines = []
+    for node_id in diff['nodes']['added']:
+        lines.append((f"+ node {node_id}", 'added'))
+    for node_id in diff['nodes']['removed']:
+        lines.append((f"- node {node_id}", 'removed'))
+    for node_id, changes in diff['nodes']['changed'].items():
+        lines.append((f"~ node {node_id}", 'changed'))
+        for key, change in changes.items():
+            lines.append((f"    {key}: {change['old']!r} -> {change['new']!r}", None))
+    for source, target in diff['edges']['added']:
+        lines.append((f"+ edge {source} -> {target}", 'added'))
+    for source, target in diff['edges']['removed']:
+        lines.append((f"- edge {source} -> {target}", 'removed'))
+    for entry in diff['edges']['changed']:
+        lines.append((f"~ edge {entry['source']} -> {entry['target']}", 'changed'))
+        for key, change in entry['changes'].items():
+            lines.append((f"    {key}: {change['old']!r} -> {change['new']!r}", None))
+    return lines
+
+
+def write_diff_html(old_graph, new_graph, diff, output_file):
+    """
+    将差异渲染为 pyvis 交互式 HTML：显示两图的并集，
+    节点/边按 新增 (绿)、删除 (红)、修改 (黄)、未变化 (灰) 着色，
+    其余样式 (大小、悬停提示、物理选项) 与 visualize_interactive 一致。
+    """
+    added_nodes = set(diff['nodes']['added'])
+    removed_nodes = set(diff['nodes']['removed'])
+    changed_nodes = diff['nodes']['changed']
+    added_edges = {tuple(edge) for edge in diff['edges']['added']}
+    removed_edges = {tuple(edge) for edge in diff['edges']['removed']}
+    changed_edges = {(entry['source'], entry['target']): entry['changes'] for entry in diff['edges']['changed']}
+
+    net = new_pyvis_network()
+
+    def add_node(graph, node_id, attrs, status):
+        style = node_visual_style(graph, node_id, attrs)
+        title = f"[{status}]\n" + style['title']
+        if status == 'changed':
+            title += "\n" + "\n".join(f"{key}: {c['old']!r} -> {c['new']!r}" for key, c in changed_nodes[node_id].items())
+        net.add_node(node_id, label=style['label'], title=title, color=DIFF_COLORS[status], size=style['size'])
+
+    for node_id, attrs in new_graph.nodes(data=True):
+        if node_id in added_nodes:
+            status = 'added'
+        elif node_id in changed_nodes:
+            status = 'changed'
+        else:
+            status = 'unchanged'
+        add_node(new_graph, node_id, attrs, status)
+    for node_id in removed_nodes:
+        add_node(old_graph, node_id, old_graph.nodes[node_id], 'removed')
+
+    def add_edge(source, target, attrs, status):
+        style = edge_visual_style(attrs)
+        title = f"[{status}]\n" + style['title']
+        if status == 'changed':
+            title += "\n" + "\n".join(f"{key}: {c['old']!r} -> {c['new']!r}" for key, c in changed_edges[(source, target)].items())
+        width = 1.5 if status == 'unchanged' else 3
+        net.add_edge(source, target, width=width, color=DIFF_COLORS[status], title=title)
+
+    for source, target, attrs in new_graph.edges(data=True):
+        if (source, target) in added_edges:
+            status = 'added'
+        elif (source, target) in changed_edges:
+            status = 'changed'
+        else:
+            status = 'unchanged'
+        add_edge(source, target, attrs, status)
+    for source, target in removed_edges:
+        add_edge(source, target, old_graph.edges[source, target], 'removed')
+
+    net.set_options(PYVIS_OPTIONS)
+    net.write_html(output_file, notebook=False)
@@ -0,0 +1,160 @@
+import csv
+import json
+import os
+from xml.sax.saxutils import escape, quoteattr
+
+from .binary_graph import write_binary_graph, BINARY_EXTENSION
+from .positions import load_positions, save_positions, neighbourhood_signatures
+from .svg_export import compute_layout, write_svg, DEFAULT_MAX_EDGES, DEFAULT_MAX_LABELS
+
+# 导出格式注册表：{格式名: ExportFormat}，按注册顺序排列
+EXPORTERS = {}
+
+
+class ExportFormat:
+    """
+    一种导出格式。
+    writer(project, output_file, **options) 将 project.graph 写入 output_file，返回 (写出的节点数, 写出的边数)；
+    options 为 export 命令的全部选项，各格式只取自己用到的部分。
+    """
+    __slots__ = ('name', 'extension', 'writer')
+
+    def __init__(self, name, extension, writer):
+        self.name = name
+        self.extension = extension
+        self.writer = writer
+
+    def default_output_file(self, project):
+        """默认输出到工程目录下的 skill_tree.<扩展名>。"""
+        return os.path.join(project.project_path, 'skill_tree' + self.extension)
+
+
+def register_exporter(name, extension):
+    """
+    注册导出格式的装饰器，例如：
+
+        @register_exporter('gexf', '.gexf')
+        def export_gexf(project, output_file, **options): ...
+    """
+    def decorator(writer):
+        EXPORTERS[name] = ExportFormat(name, extension, writer)
+        return writer
+    return decorator
+
+
+def get_exporter(name):
+    """:return: 对应的 ExportFormat；未注册时返回 None。"""
+    return EXPORTERS.get(name)
+
+
+def _text_value(value):
+    """非字符串属性值 (列表、数字等) 在文本格式中统一写成 JSON。"""
+    return value if type(value) is str else json.dumps(value, ensure_ascii=False, default=str)
+
+
+@register_exporter('gexf', '.gexf')
+def export_gexf(project, output_file, **options):
+    project.write_gexf(output_file)
+    return project.graph.number_of_nodes(), project.graph.number_of_edges()
+
+
+@register_exporter('svg', '.svg')
+def export_svg(project, output_file, min_degree=0, max_edges=DEFAULT_MAX_EDGES, max_labels=DEFAULT_MAX_LABELS,
+               iterations=None, fresh_layout=False, **options):
+    # 邻域未变的已保存节点保持原位，只为新节点和邻居有变化的节点计算布局；结果写回供下次导出 / 页面复用
+    known_positions = None if fresh_layout else load_positions(project.positions_file, project.graph)
+    positions = compute_layout(project.graph, iterations=iterations, known_positions=known_positions)
+    if project.positions_file:
+        try:
+            save_positions(project.positions_file, positions, neighbourhood_signatures(project.graph))
+        except OSError as e:
+            print(f"警告: 无法保存节点坐标到 '{project.positions_file}': {e}")
+    return write_svg(project.graph, output_file, positions=positions, min_degree=min_degree,
+                     max_edges=max_edges, max_labels=max_labels, iterations=iterations)
+
+
+# GraphML 的属性类型，按 Python 类型推断；同一属性出现多种类型时退化为 double 或 string
+_GRAPHML_TYPES = {bool: 'boolean', int: 'long', float: 'double', str: 'string'}
+
+
+def _graphml_keys(attr_dicts):
+    """扫描一遍属性字典，返回 [(属性名, GraphML 类型)]，按首次出现的顺序。"""
+    key_types = {}
+    for attrs in attr_dicts:
+        for key, value in attrs.items():
+            value_type = _GRAPHML_TYPES.get(type(value), 'string')
+            known = key_types.get(key)
+            if known is None:
+                key_types[key] = value_type
+            elif known != value_type:
+                key_types[key] = 'double' if {known, value_type} == {'long', 'double'} else 'string'
+    return list(key_types.items())
+
+
+def _graphml_value(value, value_type):
+    if value_type == 'boolean':
+        return 'true' if value else 'false'
+    if value_type == 'string':
+        return escape(_text_value(value))
+    return repr(value) if value_type == 'double' else str(value)
+
+
+def _graphml_data(attrs, keys):
+    return ''.join(f'<data key="{key_id}">{_graphml_value(attrs[name], value_type)}</data>'
+                   for key_id, name, value_type in keys if name in attrs)
+
+
+@register_exporter('graphml', '.graphml')
+def export_graphml(project, output_file, **options):
+    """
+    流式写出 GraphML：先扫描一遍属性以确定 <key> 声明，再逐个写出节点和边，
+    不在内存中构造 XML 树 (nx.write_graphml 会构造完整的树)。
+    """
+    graph = project.graph
+    node_keys = [(f'n{i}', name, value_type)
+                 for i, (name, value_type) in enumerate(_graphml_keys(attrs for _, attrs in graph.nodes(data=True)))]
+    edge_keys = [(f'e{i}', name, value_type)
+                 for i, (name, value_type) in enumerate(_graphml_keys(attrs for _, _, attrs in graph.edges(data=True)))]
+    with open(output_file, 'w', encoding='utf-8') as f:
+        f.write('<?xml version="1.0" encoding="utf-8"?>\n'
+                '<graphml xmlns="http://graphml.graphdrawing.org/xmlns" '
+                'xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" '
+                'xsi:schemaLocation="http://graphml.graphdrawing.org/xmlns '
+                'http://graphml.graphdrawing.org/xmlns/1.0/graphml.xsd">\n')
+        for domain, keys in (('node', node_keys), ('edge', edge_keys)):
+            for key_id, name, value_type in keys:
+                f.write(f'<key id="{key_id}" for="{domain}" attr.name={quoteattr(str(name))} '
+                        f'attr.type="{value_type}"/>\n')
+        f.write('<graph edgedefault="directed">\n')
+        for node_id, attrs in graph.nodes(data=True):
+            f.write(f'<node id={quoteattr(str(node_id))}>{_graphml_data(attrs, node_keys)}</node>\n')
+        for source, target, attrs in graph.edges(data=True):
+            f.write(f'<edge source={quoteattr(str(source))} target={quoteattr(str(target))}>'
+                    f'{_graphml_data(attrs, edge_keys)}</edge>\n')
+        f.write('</graph>\n</graphml>\n')
+    return graph.number_of_nodes(), graph.number_of_edges()
+
+
+@register_exporter('edgelist', '.tsv')
+def export_edgelist(project, output_file, **options):
+    """
+    制表符分隔的边列表：表头为 source、target 与所有边属性名，每条边一行。
+    非字符串属性值写成 JSON，缺失的属性为空；没有边的孤立节点不会出现在输出中。
+    """
+    graph = project.graph
+    columns = list(dict.fromkeys(key for _, _, attrs in graph.edges(data=True) for key in attrs))
+    with open(output_file, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f, delimiter='\t', lineterminator='\n')
+        writer.writerow(['source', 'target'] + columns)
+        writer.writerows(
+            [source, target] + [_text_value(attrs[key]) if key in attrs else '' for key in columns]
+            for source, target, attrs in graph.edges(data=True)
+        )
+    nodes_written = len({node_id for edge in graph.edges() for node_id in edge})
+    return nodes_written, graph.number_of_edges()
+
+
+@register_exporter('binary', BINARY_EXTENSION)
+def export_binary(project, output_file, **options):
+    """紧凑二进制格式，可用 open --from-binary 以 mmap 重新打开，见 binary_graph.py。"""
+    return write_binary_graph(project.graph, output_file)
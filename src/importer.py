@@ -0,0 +1,209 @@
+import csv
+import json
+import os
+from itertools import islice
+
+import networkx as nx
+
+from .attr_store import CompactDiGraph
+from .records import normalize_node_record, normalize_edge_record
+from .storage import GraphYamlWriter, save_graph_cache
+
+# 可映射的标准字段；未映射的其他列会作为自定义属性原样保留
+NODE_FIELDS = ('id', 'label', 'level', 'tags')
+EDGE_FIELDS = ('source', 'target', 'type', 'strength')
+DEFAULT_CHUNK_SIZE = 10000
+
+CSV_SUFFIXES = {'.csv': ',', '.tsv': '\t'}
+JSONL_SUFFIXES = ('.jsonl', '.ndjson')
+
+
+def parse_column_map(items, allowed_fields):
+    """
+    将形如 ["id=node_id", "label=name"] 的列表解析为 {字段: 列名} 字典。
+    未指定的字段默认使用同名列。
+    :raises ValueError: 格式错误或字段名不受支持时。
+    """
+    column_map = {field: field for field in allowed_fields}
+    for item in items or []:
+        field, sep, column = item.partition('=')
+        field, column = field.strip(), column.strip()
+        if not sep or not field or not column:
+            raise ValueError(f"列映射 '{item}' 格式错误，应为 字段=列名")
+        if field not in allowed_fields:
+            raise ValueError(f"不支持的字段 '{field}'，可选字段: {', '.join(allowed_fields)}")
+        column_map[field] = column
+    return column_map
+
+
+def iter_raw_records(file_path):
+    """
+    按行流式读取 CSV/TSV 或 JSONL 文件，逐条产出原始字典，不会整体载入内存。
+    :raises ValueError: 文件扩展名不受支持时。
+    """
+    suffix = os.path.splitext(file_path)[1].lower()
+    if suffix in CSV_SUFFIXES:
+        with open(file_path, 'r', encoding='utf-8-sig', newline='') as f:
+            for row in csv.DictReader(f, delimiter=CSV_SUFFIXES[suffix]):
+                row.pop(None, None) # 多余的未命名列
+                yield row
+    elif suffix in JSONL_SUFFIXES:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            for line_no, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError as e:
+                    print(f"警告: '{file_path}' 第 {line_no} 行不是有效的 JSON ({e})，已跳过此行。")
+                    continue
+                if not isinstance(record, dict):
+                    print(f"警告: '{file_path}' 第 {line_no} 行不是 JSON 对象，已跳过此行。")
+                    continue
+                yield record
+    else:
+        raise ValueError(f"不支持的文件格式 '{suffix}'，仅支持 .csv、.tsv、.jsonl、.ndjson")
+
+
+def map_record(raw, column_map, tags_sep=','):
+    """
+    按列映射把原始记录转换为 graph.yaml 风格的记录。
+    空值会被忽略；字符串形式的 tags 按 tags_sep 拆分为列表。
+    """
+    record = {}
+    used_columns = set()
+    for field, column in column_map.items():
+        if column not in raw:
+            continue
+        used_columns.add(column)
+        value = raw[column]
+        if value is None or value == '':
+            continue
+        record[field] = value
+
+    for key, value in raw.items():
+        if key in used_columns or key in record or value is None or value == '':
+            continue
+        record[key] = value
+
+    # JSONL 中的 id 常为整数；标识字段统一转为字符串，与 CSV 导入的结果一致
+    for field in ('id', 'label', 'source', 'target'):
+        if field in record and not isinstance(record[field], str):
+            record[field] = str(record[field])
+
+    tags = record.get('tags')
+    if isinstance(tags, str):
+        record['tags'] = [tag.strip() for tag in tags.split(tags_sep) if tag.strip()]
+    return record
+
+
+def _map_and_normalize(raw, column_map, tags_sep, normalize):
+    """
+    映射并规范化一条原始记录。
+    :return: (映射后的记录, normalize 的结果)；记录无法处理时打印警告并返回 (None, None)，由调用方计入跳过数。
+    """
+    try:
+        record = map_record(raw, column_map, tags_sep)
+        return record, normalize(record)
+    except (TypeError, ValueError, AttributeError) as e:
+        print(f"警告: 无法导入记录 {raw}: {e}，已跳过。")
+        return None, None
+
+
+def iter_chunks(iterable, chunk_size):
+    """将可迭代对象切分为最多 chunk_size 条的列表。"""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def import_edge_lists(relations_file, nodes_file, edges_file=None, cache_file=None,
+                      node_columns=None, edge_columns=None, tags_sep=',',
+                      chunk_size=DEFAULT_CHUNK_SIZE, progress=None, compact=True):
+    """
+    将外部节点表与边表分块流式导入为工程的 graph.yaml。
+    校验规则与 SkillTreeProject.load_relations 完全一致 (共享 normalize_*_record)。
+    内存中只常驻节点 id 集合与当前分块；若提供 cache_file，还会同时构建图并写入缓存，
+    使下一次 open 无需重新解析 YAML (不构建缓存时另外记录边的 (源, 目标) 对，用于统计去重后的边数)。
+
+    :param relations_file: 目标 graph.yaml 路径 (原子替换)。
+    :param nodes_file: 节点文件 (.csv/.tsv/.jsonl/.ndjson)。
+    :param edges_file: 边文件，可选。
+    :param cache_file: 图缓存路径，为 None 时不构建缓存。
+    :param node_columns: {字段: 列名} 节点列映射。
+    :param edge_columns: {字段: 列名} 边列映射。
+    :param tags_sep: 字符串 tags 的分隔符。
+    :param chunk_size: 每块记录数。
+    :param progress: 可选回调 progress(kind, processed_count)，kind 为 'nodes' 或 'edges'。
+    :param compact: 缓存的图是否使用 CompactDiGraph (与 SkillTreeProject.new_graph 保持一致)。
+    :return: 统计字典 {'nodes', 'edges', 'skipped_nodes', 'skipped_edges', 'graph_nodes', 'graph_edges'}。
+             nodes/edges 为写入的记录数；graph_nodes/graph_edges 为重复 id / 重复边合并后图中的实际数量，
+             与之后 open 加载得到的图一致。
+    """
+    node_columns = node_columns or {field: field for field in NODE_FIELDS}
+    edge_columns = edge_columns or {field: field for field in EDGE_FIELDS}
+    stats = {'nodes': 0, 'edges': 0, 'skipped_nodes': 0, 'skipped_edges': 0}
+
+    known_nodes = set()
+    G = None
+    known_edges = None
+    if cache_file:
+        G = CompactDiGraph() if compact else nx.DiGraph()
+    else:
+        known_edges = set()
+    header = f"# graph.yaml\n# Imported from: {os.path.basename(nodes_file)}" \
+             + (f", {os.path.basename(edges_file)}" if edges_file else "") + "\n"
+
+    with GraphYamlWriter(relations_file, header=header) as writer:
+        processed = 0
+        for chunk in iter_chunks(iter_raw_records(nodes_file), chunk_size):
+            valid = []
+            for raw in chunk:
+                record, normalized = _map_and_normalize(raw, node_columns, tags_sep, normalize_node_record)
+                if normalized is None:
+                    stats['skipped_nodes'] += 1
+                    continue
+                node_id, attrs = normalized
+                known_nodes.add(node_id)
+                if G is not None:
+                    G.add_node(node_id, **attrs)
+                valid.append(record)
+            writer.write_nodes(valid)
+            stats['nodes'] += len(valid)
+            processed += len(chunk)
+            if progress:
+                progress('nodes', processed)
+
+        writer.begin_edges()
+        if edges_file:
+            processed = 0
+            for chunk in iter_chunks(iter_raw_records(edges_file), chunk_size):
+                valid = []
+                for raw in chunk:
+                    _, normalized = _map_and_normalize(raw, edge_columns, tags_sep,
+                                                       lambda record: normalize_edge_record(record, known_nodes))
+                    if normalized is None:
+                        stats['skipped_edges'] += 1
+                        continue
+                    source_id, target_id, attrs = normalized
+                    if G is not None:
+                        G.add_edge(source_id, target_id, **attrs)
+                    else:
+                        known_edges.add((source_id, target_id))
+                    # 写入规范化后的属性，使 strength 以数字而非字符串落盘
+                    valid.append({'source': source_id, 'target': target_id, **attrs})
+                writer.write_edges(valid)
+                stats['edges'] += len(valid)
+                processed += len(chunk)
+                if progress:
+                    progress('edges', processed)
+
+    stats['graph_nodes'] = len(known_nodes)
+    stats['graph_edges'] = G.number_of_edges() if G is not None else len(known_edges)
+    if G is not None:
+        save_graph_cache(G, cache_file, relations_file)
+    return stats
@@ -0,0 +1,155 @@
+import json
+import os
+
+from .records import check_node_record, check_edge_record, coerce_id, normalize_node_record, normalize_edge_record
+from .storage import file_lock
+
+JOURNAL_FILE_NAME = 'graph.journal.jsonl'
+LOCK_FILE_NAME = '.graph.lock'
+
+# 支持的日志操作：
+#   {"op": "add_node", "node": {"id": ..., "label": ..., ...}}      与 graph.yaml 节点记录格式相同
+#   {"op": "add_edge", "edge": {"source": ..., "target": ..., ...}} 与 graph.yaml 边记录格式相同
+#   {"op": "remove_node", "id": ...}
+#   {"op": "remove_edge", "source": ..., "target": ...}
+JOURNAL_OPS = ('add_node', 'add_edge', 'remove_node', 'remove_edge')
+
+
+class ProjectJournal:
+    """
+    工程的追加式编辑日志。
+    每次编辑以一行 JSON 追加到 graph.journal.jsonl 并 fsync，
+    加载时在基础图 (graph.yaml 或其缓存) 之上按顺序重放；compact 时再折叠回 graph.yaml。
+    所有写操作都持有工程目录下的文件锁，多个脚本并发写入不会互相破坏。
+    """
+    def __init__(self, project_path):
+        self.project_path = project_path
+        self.journal_file = os.path.join(project_path, JOURNAL_FILE_NAME)
+        self.lock_file = os.path.join(project_path, LOCK_FILE_NAME)
+
+    def lock(self):
+        """返回工程级排他锁的上下文管理器。"""
+        return file_lock(self.lock_file)
+
+    def exists(self):
+        return os.path.exists(self.journal_file) and os.path.getsize(self.journal_file) > 0
+
+    def append(self, ops):
+        """
+        将一批操作追加到日志，写入后 fsync 保证落盘。
+        :param ops: 操作字典列表，写入前经 normalize_op 校验。
+        :raises ValueError: 任一操作不合法时 (整批都不会写入)。
+        """
+        lines = [json.dumps(normalize_op(op), ensure_ascii=False, default=str) + '\n' for op in ops]
+        with self.lock():
+            with open(self.journal_file, 'a', encoding='utf-8') as f:
+                f.write(''.join(lines))
+                f.flush()
+                os.fsync(f.fileno())
+
+    def read_ops(self):
+        """
+        逐条读取日志中的操作。
+        末尾不完整的行 (写入过程中崩溃) 或无法解析的行会被跳过并给出警告。
+        """
+        if not os.path.exists(self.journal_file):
+            return
+        with open(self.journal_file, 'r', encoding='utf-8') as f:
+            for line_no, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    op = json.loads(line)
+                except json.JSONDecodeError:
+                    print(f"警告: 编辑日志 '{self.journal_file}' 第 {line_no} 行不完整或已损坏，已跳过。")
+                    continue
+                if not isinstance(op, dict) or op.get('op') not in JOURNAL_OPS:
+                    print(f"警告: 编辑日志 '{self.journal_file}' 第 {line_no} 行不是有效的操作，已跳过。")
+                    continue
+                yield op
+
+    def replay(self, graph):
+        """
+        在 graph 上按顺序重放日志。节点和边的校验规则与 load_relations 相同。
+        :return: 成功应用的操作数。
+        """
+        applied = 0
+        for op_no, op in enumerate(self.read_ops(), 1):
+            try:
+                if apply_op(graph, op):
+                    applied += 1
+            except Exception as e:
+                # 与损坏的行一样跳过：一条坏操作不应使整个工程无法打开
+                print(f"警告: 编辑日志 '{self.journal_file}' 中的第 {op_no} 个操作无法应用 ({e})，已跳过。")
+        return applied
+
+    def clear(self):
+        """清空日志 (调用方应持有锁)。"""
+        if os.path.exists(self.journal_file):
+            with open(self.journal_file, 'w', encoding='utf-8') as f:
+                f.flush()
+                os.fsync(f.fileno())
+
+
+def normalize_op(op):
+    """
+    校验单个日志操作，并把其中的节点 id / 端点统一为字符串。
+    校验规则与加载时相同 (共享 check_*_record)；add_edge 的端点是否存在留到重放时检查。
+    :return: 规范化后的操作字典。
+    :raises ValueError: 操作不合法时。
+    """
+    if not isinstance(op, dict) or op.get('op') not in JOURNAL_OPS:
+        raise ValueError(f"未知的日志操作: {op!r}")
+    kind = op['op']
+    if kind == 'add_node':
+        node_id, _ = check_node_record(op.get('node'))
+        return {'op': kind, 'node': {**op['node'], 'id': node_id}}
+    if kind == 'add_edge':
+        source_id, target_id, _ = check_edge_record(op.get('edge'), strict=True)
+        return {'op': kind, 'edge': {**op['edge'], 'source': source_id, 'target': target_id}}
+    if kind == 'remove_node':
+        node_id = coerce_id(op.get('id'))
+        if node_id is None:
+            raise ValueError("remove_node 操作缺少 'id'")
+        return {'op': kind, 'id': node_id}
+    source_id, target_id = coerce_id(op.get('source')), coerce_id(op.get('target'))
+    if source_id is None or target_id is None:
+        raise ValueError("remove_edge 操作缺少 'source' 或 'target'")
+    return {'op': kind, 'source': source_id, 'target': target_id}
+
+
+def apply_op(graph, op):
+    """
+    将单个日志操作应用到图上。
+    add_* 对已存在的元素合并属性，remove_* 对不存在的元素不做任何事，
+    因此整段日志重复重放的结果不变。
+    :return: 操作被应用时返回 True。
+    """
+    kind = op.get('op')
+    if kind == 'add_node':
+        normalized = normalize_node_record(op.get('node') or {}, graph)
+        if normalized is None:
+            return False
+        node_id, attrs = normalized
+        graph.add_node(node_id, **attrs)
+        return True
+    if kind == 'add_edge':
+        normalized = normalize_edge_record(op.get('edge') or {}, graph)
+        if normalized is None:
+            return False
+        source_id, target_id, attrs = normalized
+        graph.add_edge(source_id, target_id, **attrs)
+        return True
+    if kind == 'remove_node':
+        node_id = coerce_id(op.get('id'))
+        if node_id in graph:
+            graph.remove_node(node_id)
+            return True
+        return False
+    if kind == 'remove_edge':
+        source_id, target_id = coerce_id(op.get('source')), coerce_id(op.get('target'))
+        if graph.has_edge(source_id, target_id):
+            graph.remove_edge(source_id, target_id)
+            return True
+        return False
+    return False
@@ -0,0 +1,111 @@
+import hashlib
+import json
+import math
+import os
+import tempfile
+
+POSITIONS_FILE_NAME = 'positions.json'
+# 版本 2 起同时保存各节点的邻域签名；版本 1 的文件没有签名，按不存在处理 (重新布局一次)
+POSITIONS_VERSION = 2
+
+
+def neighbourhood_signatures(graph):
+    """
+    计算每个节点的邻域签名 (后继与前驱节点 id 的摘要)。
+    节点的邻居发生变化后签名随之改变，保存的坐标即不再可信。
+    :return: {str(node_id): 十六进制摘要}。
+    """
+    signatures = {}
+    for node_id in graph.nodes():
+        digest = hashlib.blake2b(digest_size=8)
+        for neighbours in (graph.successors(node_id), graph.predecessors(node_id)):
+            for neighbour in sorted(map(str, neighbours)):
+                digest.update(neighbour.encode('utf-8'))
+                digest.update(b'\0')
+            digest.update(b'\1')
+        signatures[str(node_id)] = digest.hexdigest()
+    return signatures
+
+
+def _read_payload(positions_file):
+    """:return: 坐标文件的内容；文件不存在、已损坏或版本不符时返回 None。"""
+    if not positions_file or not os.path.exists(positions_file):
+        return None
+    try:
+        with open(positions_file, 'r', encoding='utf-8') as f:
+            payload = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"警告: 无法读取节点坐标文件 '{positions_file}': {e}")
+        return None
+    if not isinstance(payload, dict) or payload.get('version') != POSITIONS_VERSION:
+        return None
+    return payload
+
+
+def load_positions(positions_file, graph=None):
+    """
+    读取工程保存的节点坐标。
+    :param graph: 可选，当前的图。给出时只返回邻域签名与保存时一致的节点，
+                  邻居有增删 (或从未记录签名) 的节点需要重新布局。
+    :return: {str(node_id): (x, y)}，坐标为页面 (vis.js) 像素坐标；文件不存在或已损坏时返回空字典。
+    """
+    payload = _read_payload(positions_file)
+    if payload is None:
+        return {}
+    positions = {node_id: (xy[0], xy[1]) for node_id, xy in payload.get('positions', {}).items()}
+    if graph is None:
+        return positions
+    saved_signatures = payload.get('signatures') or {}
+    current_signatures = neighbourhood_signatures(graph)
+    return {node_id: xy for node_id, xy in positions.items()
+            if node_id in current_signatures and saved_signatures.get(node_id) == current_signatures[node_id]}
+
+
+def save_positions(positions_file, positions, signatures=None):
+    """
+    原子地保存节点坐标。
+    :param positions: {node_id: (x, y)}；node_id 统一按 str() 保存，与页面回传的键一致。
+    :param signatures: 生成这些坐标时的邻域签名 (见 neighbourhood_signatures)；
+                       为 None 时 (页面回传坐标) 沿用文件中已有的签名。
+    """
+    if signatures is None:
+        previous = _read_payload(positions_file) or {}
+        signatures = previous.get('signatures') or {}
+    payload = {
+        'version': POSITIONS_VERSION,
+        'positions': {str(node_id): [round(x, 2), round(y, 2)] for node_id, (x, y) in positions.items()},
+        'signatures': signatures,
+    }
+    # 每次写入使用独立的临时文件：多个页面可能同时回传坐标
+    fd, tmp_file = tempfile.mkstemp(prefix=POSITIONS_FILE_NAME + '.', suffix='.tmp',
+                                    dir=os.path.dirname(positions_file) or '.')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, ensure_ascii=False, separators=(',', ':'))
+        os.chmod(tmp_file, 0o644) # mkstemp 创建的文件仅属主可读
+        os.replace(tmp_file, positions_file)
+    except BaseException:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+        raise
+
+
+def parse_posted_positions(payload):
+    """
+    校验页面回传的坐标，格式与 vis.js network.getPositions() 相同：
+    {"positions": {"node_id": {"x": 1.0, "y": 2.0}, ...}}
+    :return: {str(node_id): (x, y)}
+    :raises ValueError: 格式不合法时。
+    """
+    if not isinstance(payload, dict) or not isinstance(payload.get('positions'), dict):
+        raise ValueError("request body must be {\"positions\": {id: {\"x\": ..., \"y\": ...}}}")
+    positions = {}
+    for node_id, xy in payload['positions'].items():
+        try:
+            x, y = float(xy['x']), float(xy['y'])
+        except (TypeError, KeyError, ValueError):
+            raise ValueError(f"invalid position for node '{node_id}'")
+        if not (math.isfinite(x) and math.isfinite(y)):
+            raise ValueError(f"invalid position for node '{node_id}'")
+        positions[str(node_id)] = (x, y)
+    return positions
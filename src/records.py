@@ -0,0 +1,103 @@
+# graph.yaml 节点/边记录的校验与规范化规则，所有写入路径 (YAML 加载、导入、编辑日志) 共用
+
+
+def coerce_id(value):
+    """将 id/source/target 等标识字段统一为字符串 (YAML 或 JSON 中常见整数 id)；缺失或为空时返回 None。"""
+    if value is None:
+        return None
+    value = str(value)
+    return value or None
+
+
+def check_node_record(node_info, existing_nodes=None):
+    """
+    按 graph.yaml 的规则校验并规范化一条节点记录。
+    :param node_info: 原始节点字典 (来自 YAML、CSV、JSONL 或编辑日志)。
+    :param existing_nodes: 已有节点的容器 (图或 id 集合)。记录更新的是其中已有的节点时，
+                           不补默认 label，避免覆盖原有的 label。
+    :return: (node_id, attrs) 元组。
+    :raises ValueError: 记录无效时。
+    """
+    if not isinstance(node_info, dict):
+        raise ValueError(f"节点定义不是字典：{node_info!r}")
+    node_id = coerce_id(node_info.get('id'))
+    if node_id is None: # 确保id存在
+        raise ValueError(f"节点定义缺少 'id' 字段：{node_info}")
+
+    label = node_info.get('label')
+    attrs_to_add = {}
+    if label is not None:
+        attrs_to_add['label'] = str(label).replace('_', ' ')
+    elif existing_nodes is None or node_id not in existing_nodes:
+        # 只在新建节点时以 id 作为默认 label
+        attrs_to_add['label'] = node_id.replace('_', ' ')
+    attrs_to_add.update((k, v) for k, v in node_info.items() if k not in ['id', 'label'])
+
+    # --- GEXF 兼容性修复 (tags 列表转字符串) ---
+    if 'tags' in attrs_to_add and isinstance(attrs_to_add['tags'], list):
+        attrs_to_add['tags'] = ",".join(map(str, attrs_to_add['tags'])) # Convert list to comma-separated string
+    # ----------------------------------------
+
+    return node_id, attrs_to_add
+
+
+def normalize_node_record(node_info, existing_nodes=None):
+    """
+    同 check_node_record，但记录无效时打印警告并返回 None (用于批量加载，跳过坏记录)。
+    """
+    try:
+        return check_node_record(node_info, existing_nodes)
+    except ValueError as e:
+        print(f"警告: {e}，已跳过此节点。")
+        return None
+
+
+def check_edge_record(edge_info, known_nodes=None, strict=False):
+    """
+    按 graph.yaml 的规则校验并规范化一条边记录。
+    :param edge_info: 原始边字典。
+    :param known_nodes: 已定义节点的容器 (图或 id 集合)，用于检查端点是否存在；为 None 时不检查。
+    :param strict: 为 True 时 strength 无法转换为数字即视为无效记录；否则只丢弃该属性并给出警告。
+    :return: (source_id, target_id, attrs) 元组。
+    :raises ValueError: 记录无效时。
+    """
+    if not isinstance(edge_info, dict):
+        raise ValueError(f"边定义不是字典：{edge_info!r}")
+    source_id = coerce_id(edge_info.get('source'))
+    target_id = coerce_id(edge_info.get('target'))
+    if source_id is None or target_id is None:
+        raise ValueError(f"边定义格式不正确，缺少 'source' 或 'target' 字段：{edge_info}")
+
+    # 确保源和目标节点存在，避免 Key Error
+    if known_nodes is not None:
+        if source_id not in known_nodes:
+            raise ValueError(f"边 '{source_id} -> {target_id}' 的源节点 '{source_id}' 未定义在 'nodes' 部分")
+        if target_id not in known_nodes:
+            raise ValueError(f"边 '{source_id} -> {target_id}' 的目标节点 '{target_id}' 未定义在 'nodes' 部分")
+
+    attrs_to_add_edge = {k: v for k, v in edge_info.items() if k not in ['source', 'target']}
+
+    # --- GEXF 兼容性修复 (strength 强制转换为 float) ---
+    if 'strength' in attrs_to_add_edge:
+        try:
+            attrs_to_add_edge['strength'] = float(attrs_to_add_edge['strength'])
+        except (ValueError, TypeError):
+            message = f"边 '{source_id} -> {target_id}' 的 'strength' 属性值 '{attrs_to_add_edge['strength']}' 无法转换为数字"
+            if strict:
+                raise ValueError(message)
+            print(f"警告: {message}，将跳过此属性。")
+            del attrs_to_add_edge['strength'] # Remove if conversion fails
+    # --------------------------------------------------
+
+    return source_id, target_id, attrs_to_add_edge
+
+
+def normalize_edge_record(edge_info, known_nodes):
+    """
+    同 check_edge_record，但记录无效时打印警告并返回 None (用于批量加载，跳过坏记录)。
+    """
+    try:
+        return check_edge_record(edge_info, known_nodes)
+    except ValueError as e:
+        print(f"警告: {e}，已跳过此边。")
+        return None
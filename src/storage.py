@@ -0,0 +1,215 @@
+import os
+import pickle
+from contextlib import contextmanager
+from itertools import islice
+
+import yaml
+
+if os.name == 'nt':
+    import msvcrt
+else:
+    import fcntl
+
+# 若 PyYAML 编译了 libyaml 扩展，则使用更快的 C 实现 (语义与 safe_load/safe_dump 相同)
+YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+YAML_DUMPER = getattr(yaml, 'CSafeDumper', yaml.SafeDumper)
+
+# 缓存文件格式版本，结构变化时递增，旧缓存会被自动忽略
+GRAPH_CACHE_VERSION = 2
+
+
+def file_signature(file_path):
+    """
+    返回文件的轻量签名 (大小, 修改时间纳秒)，用于判断缓存是否过期。
+    文件不存在时返回 None。
+    """
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        return None
+    return (st.st_size, st.st_mtime_ns)
+
+
+def load_graph_cache(cache_file, source_file):
+    """
+    读取与 source_file 对应的图缓存。
+    仅当缓存版本与源文件签名都匹配时才返回图对象，否则返回 None。
+    """
+    if not os.path.exists(cache_file):
+        return None
+    signature = file_signature(source_file)
+    if signature is None:
+        return None
+    try:
+        with open(cache_file, 'rb') as f:
+            payload = pickle.load(f)
+    except Exception:
+        return None # 缓存损坏时直接回退到解析 YAML
+    if not isinstance(payload, dict):
+        return None
+    if payload.get('version') != GRAPH_CACHE_VERSION or payload.get('signature') != signature:
+        return None
+    return payload.get('graph')
+
+
+def save_graph_cache(graph, cache_file, source_file):
+    """
+    将已构建的图写入缓存文件 (先写临时文件再原子替换)。
+    :return: 写入成功返回 True。
+    """
+    signature = file_signature(source_file)
+    if signature is None:
+        return False
+    tmp_file = cache_file + '.tmp'
+    try:
+        with open(tmp_file, 'wb') as f:
+            pickle.dump({'version': GRAPH_CACHE_VERSION, 'signature': signature, 'graph': graph},
+                        f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_file, cache_file)
+        return True
+    except Exception as e:
+        print(f"警告: 写入图缓存 '{cache_file}' 失败: {e}")
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+        return False
+
+
+class GraphYamlWriter:
+    """
+    以分块方式流式写出 graph.yaml，避免一次性在内存中构造完整的 nodes/edges 列表。
+    先写入临时文件，close() 时原子替换目标文件。
+
+    用法：
+        with GraphYamlWriter(path) as writer:
+            writer.write_nodes(chunk)
+            writer.begin_edges()
+            writer.write_edges(chunk)
+    """
+    def __init__(self, file_path, header=None):
+        self.file_path = file_path
+        self.tmp_path = file_path + '.tmp'
+        self._f = open(self.tmp_path, 'w', encoding='utf-8')
+        if header:
+            self._f.write(header)
+        self._f.write('nodes:\n')
+        self._section = 'nodes'
+        self._section_empty = True
+
+    def _dump(self, records):
+        if not records:
+            return
+        # 顶层序列与键同一缩进在 YAML 中是合法的块序列
+        self._f.write(yaml.dump(list(records), Dumper=YAML_DUMPER, allow_unicode=True,
+                               default_flow_style=False, sort_keys=False))
+        self._section_empty = False
+
+    def write_nodes(self, records):
+        """写入一批节点记录。"""
+        self._dump(records)
+
+    def begin_edges(self):
+        """结束 nodes 部分并开始 edges 部分。"""
+        if self._section == 'edges':
+            return
+        if self._section_empty:
+            self._f.write('  []\n')
+        self._f.write('\nedges:\n')
+        self._section = 'edges'
+        self._section_empty = True
+
+    def write_edges(self, records):
+        """写入一批边记录。"""
+        self.begin_edges()
+        self._dump(records)
+
+    def close(self):
+        """完成写入并用临时文件原子替换目标文件。"""
+        self.begin_edges()
+        if self._section_empty:
+            self._f.write('  []\n')
+        self._f.flush()
+        os.fsync(self._f.fileno())
+        self._f.close()
+        os.replace(self.tmp_path, self.file_path)
+
+    def abort(self):
+        """放弃写入，删除临时文件，目标文件保持不变。"""
+        self._f.close()
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+
+def node_to_record(node_id, attrs):
+    """
+    将图中的节点还原为 graph.yaml 风格的记录。
+    load_relations 会把 tags 列表拼接为逗号分隔字符串，这里再拆回列表，便于人工编辑。
+    """
+    record = {'id': node_id}
+    record.update(attrs)
+    if isinstance(record.get('tags'), str):
+        record['tags'] = [tag for tag in record['tags'].split(',') if tag]
+    return record
+
+
+def edge_to_record(source_id, target_id, attrs):
+    """将图中的边还原为 graph.yaml 风格的记录。"""
+    record = {'source': source_id, 'target': target_id}
+    record.update(attrs)
+    return record
+
+
+def write_graph_yaml(graph, file_path, chunk_size=10000, header=None):
+    """以分块方式将整张图写回 graph.yaml (原子替换)。"""
+    with GraphYamlWriter(file_path, header=header) as writer:
+        nodes = (node_to_record(n, d) for n, d in graph.nodes(data=True))
+        while True:
+            chunk = list(islice(nodes, chunk_size))
+            if not chunk:
+                break
+            writer.write_nodes(chunk)
+        edges = (edge_to_record(u, v, d) for u, v, d in graph.edges(data=True))
+        while True:
+            chunk = list(islice(edges, chunk_size))
+            if not chunk:
+                break
+            writer.write_edges(chunk)
+
+
+@contextmanager
+def file_lock(lock_path):
+    """
+    跨进程的排他文件锁 (POSIX 使用 fcntl.flock，Windows 使用 msvcrt.locking)。
+    锁在 with 块结束或进程退出时自动释放。
+    """
+    f = open(lock_path, 'a+')
+    try:
+        if os.name == 'nt':
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError: # LK_LOCK 重试约 10 秒后仍失败会抛出，继续等待
+                    continue
+        else:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        yield
+    finally:
+        try:
+            if os.name == 'nt':
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+        finally:
+            f.close()
@@ -0,0 +1,378 @@
+import heapq
+import math
+import random
+from array import array
+from collections import deque
+from xml.sax.saxutils import escape
+
+from .community import CSRAdjacency, DEFAULT_SEED
+from .core import node_visual_style, edge_visual_style
+
+DEFAULT_LAYOUT_ITERATIONS = 50
+MIN_LAYOUT_ITERATIONS = 8
+# 自动选择迭代次数时，节点数 x 迭代次数的上限，保证大图的布局时间可控
+LAYOUT_WORK_BUDGET = 1_000_000
+DEFAULT_MAX_EDGES = 100_000
+DEFAULT_MAX_LABELS = 1_000
+NODE_SPACING = 40.0  # 布局内部坐标每单位对应的像素数
+CANVAS_MARGIN = 60.0
+BACKGROUND_COLOR = '#222222'
+FONT_COLOR = 'white'
+
+
+def compute_layout(graph, iterations=None, seed=DEFAULT_SEED, known_positions=None):
+    """
+    纯 Python 的力导向布局 (Fruchterman-Reingold 的网格变体，引力为线性)。
+    近场斥力只在均匀网格的相邻格子内逐对计算，更外一圈的格子按质心近似，
+    引力沿 CSR 邻接表中的边计算，因此每轮迭代约为 O(节点数 + 边数)，而不是 O(节点数^2)。
+    :param iterations: 迭代次数；为 None 时按图的规模自动选择。
+    :param known_positions: 可选，上次保存的 {str(node_id): (x, y)}。其中的节点保持原位，
+                            只对其余 (新增) 节点做局部布局，见 _warm_start_layout。
+    :return: {node_id: (x, y)}，像素坐标 (与页面中 vis.js 的坐标一致)。
+    """
+    adjacency, node_ids = CSRAdjacency.from_graph(graph)
+    n = adjacency.size
+    if n == 0:
+        return {}
+    if known_positions and any(str(node_id) in known_positions for node_id in node_ids):
+        return _warm_start_layout(adjacency, node_ids, known_positions, random.Random(seed),
+                                  iterations=DEFAULT_LAYOUT_ITERATIONS if iterations is None else iterations)
+    if iterations is None:
+        iterations = min(DEFAULT_LAYOUT_ITERATIONS, max(MIN_LAYOUT_ITERATIONS, LAYOUT_WORK_BUDGET // n))
+
+    side = 2 * math.sqrt(n) # 初始网格的边长 (节点间距为 k)
+    rng = random.Random(seed)
+    offsets, neighbors = adjacency.offsets, adjacency.neighbors
+    xs, ys = _initial_positions(adjacency, rng)
+    # 理想边长 k = 2：斥力 k^2 / d，引力线性 (d)，二者在 d = k 处平衡
+    k_sq = 4.0
+    cutoff = 3.0          # 近场斥力的截断距离，同时也是网格边长
+    cutoff_sq = cutoff * cutoff
+    temperature = min(side / 10.0, 20.0) # 初始布局已较合理，大图也不需要大范围移动
+    cooling = temperature / (iterations + 1)
+    forward_cells = ((1, -1), (1, 0), (1, 1), (0, 1))
+    far_cells = [(ox, oy) for ox in range(-2, 3) for oy in range(-2, 3) if max(abs(ox), abs(oy)) == 2]
+
+    for _ in range(iterations):
+        grid = {}
+        for i in range(n):
+            key = (int(xs[i] // cutoff), int(ys[i] // cutoff))
+            cell = grid.get(key)
+            if cell is None:
+                grid[key] = [i]
+            else:
+                cell.append(i)
+
+        disp_x = [0.0] * n
+        disp_y = [0.0] * n
+        # 每对相邻格子只访问一次 (格子内部两两之间，再加上 4 个"前向"相邻格子)，
+        # 作用力与反作用力一次算完；循环体内联以避免函数调用开销
+        centroids = {key: (sum(xs[i] for i in cell) / len(cell), sum(ys[i] for i in cell) / len(cell), len(cell))
+                     for key, cell in grid.items()}
+        for (cx, cy), cell in grid.items():
+            # 远场：外圈格子按质心与节点数近似为一个点，对本格所有节点施加相同的斥力
+            gx, gy, _ = centroids[(cx, cy)]
+            fx = fy = 0.0
+            for ox, oy in far_cells:
+                far = centroids.get((cx + ox, cy + oy))
+                if far is not None:
+                    dx = gx - far[0]
+                    dy = gy - far[1]
+                    scale = k_sq * far[2] / max(dx * dx + dy * dy, 1e-4)
+                    fx += dx * scale
+                    fy += dy * scale
+            for i in cell:
+                disp_x[i] += fx
+                disp_y[i] += fy
+
+            for a, i in enumerate(cell):
+                xi, yi = xs[i], ys[i]
+                fx = fy = 0.0
+                for b in range(a + 1, len(cell)):
+                    j = cell[b]
+                    dx = xi - xs[j]
+                    dy = yi - ys[j]
+                    dist_sq = dx * dx + dy * dy
+                    if dist_sq < cutoff_sq:
+                        if dist_sq < 1e-9:
+                            dx, dy, dist_sq = rng.uniform(-0.01, 0.01), rng.uniform(-0.01, 0.01), 1e-4
+                        scale = k_sq / dist_sq
+                        fx += dx * scale
+                        fy += dy * scale
+                        disp_x[j] -= dx * scale
+                        disp_y[j] -= dy * scale
+                disp_x[i] += fx
+                disp_y[i] += fy
+            for ox, oy in forward_cells:
+                other = grid.get((cx + ox, cy + oy))
+                if other is None:
+                    continue
+                for i in cell:
+                    xi, yi = xs[i], ys[i]
+                    fx = fy = 0.0
+                    for j in other:
+                        dx = xi - xs[j]
+                        dy = yi - ys[j]
+                        dist_sq = dx * dx + dy * dy
+                        if dist_sq < cutoff_sq:
+                            scale = k_sq / max(dist_sq, 1e-4)
+                            fx += dx * scale
+                            fy += dy * scale
+                            disp_x[j] -= dx * scale
+                            disp_y[j] -= dy * scale
+                    disp_x[i] += fx
+                    disp_y[i] += fy
+
+        for i in range(n):
+            xi, yi = xs[i], ys[i]
+            fx = fy = 0.0
+            for k in range(offsets[i], offsets[i + 1]):
+                j = neighbors[k]
+                dx = xi - xs[j]
+                dy = yi - ys[j]
+                # 线性引力：沿单位向量方向 dx / d * d = dx
+                fx -= dx
+                fy -= dy
+            fx += disp_x[i]
+            fy += disp_y[i]
+            length = math.sqrt(fx * fx + fy * fy)
+            if length > 0:
+                step = min(length, temperature) / length
+                xs[i] = xi + fx * step
+                ys[i] = yi + fy * step
+        temperature -= cooling
+
+    return {node_id: (xs[i] * NODE_SPACING, ys[i] * NODE_SPACING) for i, node_id in enumerate(node_ids)}
+
+
+def _warm_start_layout(adjacency, node_ids, known_positions, rng, iterations=DEFAULT_LAYOUT_ITERATIONS):
+    """
+    增量布局：已知坐标的节点固定不动；新节点按广度优先顺序放在已放置邻居的质心附近
+    (与已知节点都不连通的放在已知区域内的随机位置)，然后只对新节点做若干轮局部受力迭代。
+    每轮的开销与新节点的数量及其邻域大小成正比，与整张图的规模基本无关。
+    """
+    n = adjacency.size
+    offsets, neighbors = adjacency.offsets, adjacency.neighbors
+    xs = array('d', [0.0]) * n
+    ys = array('d', [0.0]) * n
+    placed = bytearray(n)
+    queue = deque()
+    for i, node_id in enumerate(node_ids):
+        xy = known_positions.get(str(node_id))
+        if xy is not None:
+            xs[i], ys[i] = xy[0] / NODE_SPACING, xy[1] / NODE_SPACING
+            placed[i] = 1
+            queue.append(i)
+    movable = [i for i in range(n) if not placed[i]]
+    if movable:
+        fixed = [i for i in range(n) if placed[i]]
+        min_x, max_x = min(xs[i] for i in fixed), max(xs[i] for i in fixed)
+        min_y, max_y = min(ys[i] for i in fixed), max(ys[i] for i in fixed)
+
+        def place(i):
+            sx = sy = 0.0
+            count = 0
+            for k in range(offsets[i], offsets[i + 1]):
+                j = neighbors[k]
+                if placed[j]:
+                    sx += xs[j]
+                    sy += ys[j]
+                    count += 1
+            if count:
+                xs[i] = sx / count + rng.uniform(-1.0, 1.0)
+                ys[i] = sy / count + rng.uniform(-1.0, 1.0)
+            else:
+                xs[i] = rng.uniform(min_x, max_x)
+                ys[i] = rng.uniform(min_y, max_y)
+            placed[i] = 1
+
+        def spread():
+            """广度优先地放置 queue 中节点的未放置邻居。"""
+            while queue:
+                i = queue.popleft()
+                for k in range(offsets[i], offsets[i + 1]):
+                    j = neighbors[k]
+                    if not placed[j]:
+                        place(j)
+                        queue.append(j)
+
+        # 从已知节点出发做多源广度优先遍历，新节点依次落在已放置的邻居旁边；
+        # 剩下的是与已知节点不连通的新分量，各自从一个随机位置开始扩散
+        spread()
+        for i in movable:
+            if not placed[i]:
+                place(i)
+                queue.append(i)
+                spread()
+
+        k_sq = 4.0
+        cutoff = 3.0
+        cutoff_sq = cutoff * cutoff
+        fixed_grid = {}
+        for i in fixed:
+            fixed_grid.setdefault((int(xs[i] // cutoff), int(ys[i] // cutoff)), []).append(i)
+        temperature = 2.0
+        cooling = temperature / (iterations + 1)
+        for _ in range(iterations):
+            movable_grid = {}
+            for i in movable:
+                movable_grid.setdefault((int(xs[i] // cutoff), int(ys[i] // cutoff)), []).append(i)
+            for i in movable:
+                xi, yi = xs[i], ys[i]
+                cx, cy = int(xi // cutoff), int(yi // cutoff)
+                fx = fy = 0.0
+                for gx in (cx - 1, cx, cx + 1):
+                    for gy in (cy - 1, cy, cy + 1):
+                        for grid in (fixed_grid, movable_grid):
+                            for j in grid.get((gx, gy), ()):
+                                dx = xi - xs[j]
+                                dy = yi - ys[j]
+                                dist_sq = dx * dx + dy * dy
+                                if dist_sq < cutoff_sq and j != i:
+                                    scale = k_sq / max(dist_sq, 1e-4)
+                                    fx += dx * scale
+                                    fy += dy * scale
+                for k in range(offsets[i], offsets[i + 1]):
+                    j = neighbors[k]
+                    fx -= xi - xs[j]
+                    fy -= yi - ys[j]
+                length = math.sqrt(fx * fx + fy * fy)
+                if length > 0:
+                    step = min(length, temperature) / length
+                    xs[i] = xi + fx * step
+                    ys[i] = yi + fy * step
+            temperature -= cooling
+
+    return {node_id: (xs[i] * NODE_SPACING, ys[i] * NODE_SPACING) for i, node_id in enumerate(node_ids)}
+
+
+def _initial_positions(adjacency, rng, spacing=2.0):
+    """
+    初始布局：按广度优先顺序把节点依次放到正方形网格上 (逐行蛇形排列)，再加少量抖动。
+    相连的节点一开始就彼此靠近，避免随机初始化时各簇被引力从全图范围拉到一处、
+    挤成高密度团块而使网格斥力退化为平方复杂度。
+    """
+    n = adjacency.size
+    offsets, neighbors = adjacency.offsets, adjacency.neighbors
+    order = []
+    visited = bytearray(n)
+    for root in range(n):
+        if visited[root]:
+            continue
+        visited[root] = 1
+        queue = deque([root])
+        while queue:
+            i = queue.popleft()
+            order.append(i)
+            for k in range(offsets[i], offsets[i + 1]):
+                j = neighbors[k]
+                if not visited[j]:
+                    visited[j] = 1
+                    queue.append(j)
+
+    columns = max(1, math.ceil(math.sqrt(n)))
+    xs = array('d', [0.0]) * n
+    ys = array('d', [0.0]) * n
+    for position, i in enumerate(order):
+        row, column = divmod(position, columns)
+        if row % 2:
+            column = columns - 1 - column
+        xs[i] = (column + rng.uniform(-0.25, 0.25)) * spacing
+        ys[i] = (row + rng.uniform(-0.25, 0.25)) * spacing
+    return xs, ys
+
+
+def select_edges(graph, nodes, max_edges=None):
+    """
+    选出要绘制的边：两端点都在 nodes 中；若超过 max_edges，
+    优先保留两端度数较小者更大的边 (即连接重要节点之间的边)。
+    """
+    candidates = ((u, v) for u, v in graph.edges() if u in nodes and v in nodes)
+    if max_edges is None:
+        return list(candidates)
+    degree = graph.degree
+    return heapq.nlargest(max_edges, candidates, key=lambda edge: min(degree(edge[0]), degree(edge[1])))
+
+
+def write_svg(graph, output_file, positions=None, min_degree=0, max_edges=DEFAULT_MAX_EDGES,
+              max_labels=DEFAULT_MAX_LABELS, iterations=None):
+    """
+    将图渲染为 SVG 并直接流式写入文件，不依赖浏览器。
+    节点颜色/大小、边颜色与 visualize_interactive 使用同一套规则。
+    为使大图的 SVG 保持较小：度数低于 min_degree 的节点不绘制，边最多绘制 max_edges 条，
+    只有度数最高的 max_labels 个节点绘制标签 (其余节点仍保留悬停提示)；
+    边按颜色分组输出，不带单独的悬停提示。
+    :param positions: 可选，compute_layout 计算出的 {node_id: (x, y)} 像素坐标；缺失时现场计算。
+    :return: (绘制的节点数, 绘制的边数)。
+    """
+    if positions is None:
+        positions = compute_layout(graph, iterations=iterations)
+
+    degree = graph.degree
+    nodes = {node_id for node_id in graph.nodes() if degree(node_id) >= min_degree and node_id in positions}
+    edges = select_edges(graph, nodes, max_edges)
+    labeled = set(heapq.nlargest(max_labels, nodes, key=degree)) if max_labels else set()
+    node_styles = {node_id: node_visual_style(graph, node_id, graph.nodes[node_id]) for node_id in nodes}
+
+    if nodes:
+        min_x = min(positions[node_id][0] for node_id in nodes)
+        min_y = min(positions[node_id][1] for node_id in nodes)
+        max_x = max(positions[node_id][0] for node_id in nodes)
+        max_y = max(positions[node_id][1] for node_id in nodes)
+    else:
+        min_x = min_y = max_x = max_y = 0.0
+    width = max_x - min_x + 2 * CANVAS_MARGIN
+    height = max_y - min_y + 2 * CANVAS_MARGIN
+
+    def to_canvas(node_id):
+        x, y = positions[node_id]
+        return x - min_x + CANVAS_MARGIN, y - min_y + CANVAS_MARGIN
+
+    # 按颜色分组，同组的边共享描边颜色与箭头，避免在每条边上重复这些属性
+    edges_by_color = {}
+    for source, target in edges:
+        color = edge_visual_style(graph.edges[source, target])['color']
+        edges_by_color.setdefault(color, []).append((source, target))
+
+    with open(output_file, 'w', encoding='utf-8', buffering=1 << 20) as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        f.write(f'<svg xmlns="http://www.w3.org/2000/svg" width="{width:.0f}" height="{height:.0f}" '
+                f'viewBox="0 0 {width:.0f} {height:.0f}">\n')
+        f.write('<defs>\n')
+        for index, color in enumerate(edges_by_color):
+            f.write(f'<marker id="arrow{index}" viewBox="0 0 10 10" refX="10" refY="5" markerWidth="6" markerHeight="6" '
+                    f'orient="auto-start-reverse"><path d="M 0 0 L 10 5 L 0 10 z" fill="{color}"/></marker>\n')
+        f.write('</defs>\n')
+        f.write(f'<rect width="100%" height="100%" fill="{BACKGROUND_COLOR}"/>\n')
+
+        for index, (color, color_edges) in enumerate(edges_by_color.items()):
+            f.write(f'<g class="edges" stroke="{color}" stroke-width="1.5" marker-end="url(#arrow{index})">\n')
+            for source, target in color_edges:
+                x1, y1 = to_canvas(source)
+                x2, y2 = to_canvas(target)
+                # 箭头停在目标节点圆周上，而不是被圆遮住
+                length = math.hypot(x2 - x1, y2 - y1)
+                if length > 0:
+                    shrink = min(node_styles[target]['size'] / 2, length) / length
+                    x2 -= (x2 - x1) * shrink
+                    y2 -= (y2 - y1) * shrink
+                f.write(f'<line x1="{x1:.1f}" y1="{y1:.1f}" x2="{x2:.1f}" y2="{y2:.1f}"/>\n')
+            f.write('</g>\n')
+
+        f.write('<g class="nodes" stroke="white" stroke-width="1">\n')
+        for node_id in nodes:
+            style = node_styles[node_id]
+            x, y = to_canvas(node_id)
+            f.write(f'<circle cx="{x:.1f}" cy="{y:.1f}" r="{style["size"] / 2:.1f}" fill="{style["color"]}">'
+                    f'<title>{escape(style["title"])}</title></circle>\n')
+        f.write('</g>\n')
+
+        f.write(f'<g class="labels" fill="{FONT_COLOR}" font-family="sans-serif" font-size="12" text-anchor="middle">\n')
+        for node_id in labeled:
+            style = node_styles[node_id]
+            x, y = to_canvas(node_id)
+            f.write(f'<text x="{x:.1f}" y="{y + style["size"] / 2 + 12:.1f}">{escape(style["label"])}</text>\n')
+        f.write('</g>\n')
+        f.write('</svg>\n')
+
+    return len(nodes), len(edges)
@@ -0,0 +1,166 @@
+import csv
+import json
+import math
+
+import networkx as nx
+import pytest
+
+from src.attr_store import CompactDiGraph
+from src.binary_graph import BinaryGraph, write_binary_graph
+from src.core import SkillTreeProject
+from src.exporters import _text_value, export_edgelist, export_graphml
+
+
+def build_graph(graph):
+    """覆盖各类属性值的小图：整数 id、列表、布尔、None、NaN 与缺失的 strength、int/float 混合列。"""
+    graph.add_node('Mathematics', label='Mathematics', tags=['core', 'theory'], core=True, weight=3, score=1)
+    graph.add_node(42, label='Answer', core=False, note=None, score=2.5)
+    graph.add_node('Linear_Algebra', label='Linear Algebra', tags=[], weight=-1)
+    graph.add_node('Isolated')
+    graph.add_edge('Mathematics', 42, type='DEPENDS_ON', strength=0.5, directed=True)
+    graph.add_edge('Mathematics', 'Linear_Algebra', type='HAS_SUBFIELD', strength=float('nan'), notes=None)
+    graph.add_edge(42, 'Linear_Algebra', type='RELATED_TO', directed=False)
+    graph.add_edge('Linear_Algebra', 'Mathematics', type='RELATED_TO', strength=1.0, refs=['a', 1])
+    return graph
+
+
+@pytest.fixture(params=[nx.DiGraph, CompactDiGraph], ids=['digraph', 'compact'])
+def graph(request):
+    return build_graph(request.param())
+
+
+def same_value(actual, expected):
+    if isinstance(expected, float) and math.isnan(expected):
+        return isinstance(actual, float) and math.isnan(actual)
+    return type(actual) is type(expected) and actual == expected
+
+
+def assert_same_items(actual, expected):
+    """按顺序比较 [(键..., 属性字典)]，NaN 视为相等，且值的类型必须一致。"""
+    assert [item[:-1] for item in actual] == [item[:-1] for item in expected]
+    for actual_item, expected_item in zip(actual, expected):
+        actual_attrs, expected_attrs = actual_item[-1], expected_item[-1]
+        assert actual_attrs.keys() == expected_attrs.keys(), actual_item[:-1]
+        for key, value in expected_attrs.items():
+            assert same_value(actual_attrs[key], value), (actual_item[:-1], key, actual_attrs[key], value)
+
+
+def graph_items(graph):
+    nodes = [(node_id, dict(attrs)) for node_id, attrs in graph.nodes(data=True)]
+    edges = [(source, target, dict(attrs)) for source, target, attrs in graph.edges(data=True)]
+    return nodes, edges
+
+
+def test_binary_round_trip(graph, tmp_path):
+    output_file = str(tmp_path / 'graph.skgb')
+    assert write_binary_graph(graph, output_file) == (4, 4)
+
+    with BinaryGraph(output_file) as binary_graph:
+        loaded = binary_graph.to_graph(nx.DiGraph())
+
+    expected_nodes, expected_edges = graph_items(graph)
+    loaded_nodes, loaded_edges = graph_items(loaded)
+    assert_same_items(loaded_nodes, expected_nodes)
+    assert_same_items(loaded_edges, expected_edges)
+
+
+def test_binary_none_values_are_decoded_once(graph, tmp_path, monkeypatch):
+    output_file = str(tmp_path / 'graph.skgb')
+    write_binary_graph(graph, output_file)
+
+    with BinaryGraph(output_file) as binary_graph:
+        node_index = [binary_graph.node_id(i) for i in range(binary_graph.node_count)].index(42)
+        code = binary_graph.node_columns['note'][node_index]
+        decoded = []
+        loads = json.loads
+        monkeypatch.setattr('src.binary_graph.json.loads', lambda text: decoded.append(text) or loads(text))
+        assert binary_graph.value(code) is None
+        assert binary_graph.value(code) is None
+        assert decoded == ['null']
+
+
+def graphml_expected(value):
+    """GraphML 中 id 为字符串；列表与 None 等非标量值以 JSON 文本写出。"""
+    if type(value) in (bool, int, float, str):
+        return value
+    return json.dumps(value, ensure_ascii=False)
+
+
+def test_graphml_round_trip(graph, tmp_path):
+    project = SkillTreeProject(str(tmp_path))
+    project.graph = graph
+    output_file = str(tmp_path / 'graph.graphml')
+    assert export_graphml(project, output_file) == (4, 4)
+
+    loaded = nx.read_graphml(output_file)
+
+    expected_nodes, expected_edges = graph_items(graph)
+    expected_nodes = [(str(node_id), {key: graphml_expected(value) for key, value in attrs.items()})
+                      for node_id, attrs in expected_nodes]
+    expected_edges = [(str(source), str(target), {key: graphml_expected(value) for key, value in attrs.items()})
+                      for source, target, attrs in expected_edges]
+    # score 同时有 int 与 float 取值，整列按 double 写出
+    expected_nodes[0][1]['score'] = 1.0
+    loaded_nodes, loaded_edges = graph_items(loaded)
+    assert_same_items(loaded_nodes, expected_nodes)
+    assert_same_items(loaded_edges, expected_edges)
+
+
+def test_edgelist_round_trip(graph, tmp_path):
+    project = SkillTreeProject(str(tmp_path))
+    project.graph = graph
+    output_file = str(tmp_path / 'graph.tsv')
+    # 孤立节点不出现在边列表中
+    assert export_edgelist(project, output_file) == (3, 4)
+
+    with open(output_file, 'r', encoding='utf-8', newline='') as f:
+        rows = list(csv.reader(f, delimiter='\t'))
+
+    columns = rows[0][2:]
+    assert rows[0][:2] == ['source', 'target']
+    assert columns == ['type', 'strength', 'directed', 'notes', 'refs']
+    expected_rows = [[str(source), str(target)]
+                     + [_text_value(attrs[key]) if key in attrs else '' for key in columns]
+                     for source, target, attrs in graph.edges(data=True)]
+    assert rows[1:] == expected_rows
+    loaded = [(row[0], row[1], {key: value for key, value in zip(columns, row[2:]) if value}) for row in rows[1:]]
+    assert [(source, target, attrs['refs']) for source, target, attrs in loaded if 'refs' in attrs] == \
+        [('Linear_Algebra', 'Mathematics', '["a", 1]')]
+    assert loaded[0][2] == {'type': 'DEPENDS_ON', 'strength': '0.5', 'directed': 'true'}
+    assert loaded[1][2] == {'type': 'HAS_SUBFIELD', 'strength': 'NaN', 'notes': 'null'}
+
+
+@pytest.mark.parametrize('compact', [True, False], ids=['compact', 'digraph'])
+def test_load_binary_round_trip(graph, tmp_path, compact):
+    output_file = str(tmp_path / 'graph.skgb')
+    write_binary_graph(graph, output_file)
+    project = SkillTreeProject(str(tmp_path), config={'compact_attributes': compact})
+    # 编辑日志不参与 --from-binary 的加载
+    project.journal.append([{'op': 'remove_node', 'id': 'Isolated'}])
+
+    assert project.load_binary(output_file)
+
+    assert isinstance(project.graph, CompactDiGraph) == compact
+    expected_nodes, expected_edges = graph_items(graph)
+    loaded_nodes, loaded_edges = graph_items(project.graph)
+    assert_same_items(loaded_nodes, expected_nodes)
+    assert_same_items(loaded_edges, expected_edges)
+
+
+def test_open_from_binary_workflow(graph, tmp_path):
+    output_file = str(tmp_path / 'graph.skgb')
+    write_binary_graph(graph, output_file)
+    project = SkillTreeProject(str(tmp_path))
+
+    project.run_workflow(skip_vis=True, skip_analyze=True, skip_export_gexf=True, skip_query=True,
+                         binary_file=output_file)
+
+    assert list(project.graph.nodes()) == list(graph.nodes())
+    assert list(project.graph.edges()) == list(graph.edges())
+
+
+def test_load_binary_rejects_other_files(tmp_path):
+    not_binary = tmp_path / 'graph.yaml'
+    not_binary.write_text('nodes: []\n', encoding='utf-8')
+    project = SkillTreeProject(str(tmp_path))
+    assert not project.load_binary(str(not_binary))
@@ -0,0 +1,22 @@
+import pytest
+
+from src.core import SkillTreeProject
+from src.importer import import_edge_lists
+
+NODES = '{"id": 1, "label": "One"}\n{"id": 2}\n{"id": 3}\n{"id": 1, "level": "advanced"}\n'
+EDGES = 'source,target,type\n1,2,A\n2,3,B\n1,2,C\n3,9,D\n'
+
+
+@pytest.mark.parametrize('use_cache', [True, False], ids=['cache', 'no-cache'])
+def test_import_reports_counts_of_the_built_graph(tmp_path, use_cache):
+    (tmp_path / 'nodes.jsonl').write_text(NODES, encoding='utf-8')
+    (tmp_path / 'edges.csv').write_text(EDGES, encoding='utf-8')
+    project = SkillTreeProject(str(tmp_path))
+
+    stats = import_edge_lists(project.relations_file, str(tmp_path / 'nodes.jsonl'), str(tmp_path / 'edges.csv'),
+                              cache_file=project.cache_file if use_cache else None)
+
+    assert (stats['nodes'], stats['edges'], stats['skipped_edges']) == (4, 3, 1)
+    assert project.load_relations()
+    assert (stats['graph_nodes'], stats['graph_edges']) == \
+        (project.graph.number_of_nodes(), project.graph.number_of_edges()) == (3, 2)
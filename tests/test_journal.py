@@ -0,0 +1,42 @@
+import pytest
+import networkx as nx
+
+from src.attr_store import CompactDiGraph
+from src.core import SkillTreeProject
+from src.journal import ProjectJournal, apply_op
+
+
+@pytest.fixture(params=[nx.DiGraph, CompactDiGraph], ids=['digraph', 'compact'])
+def graph(request):
+    graph = request.param()
+    graph.add_node('CS', label='计算机科学', level='foundational')
+    return graph
+
+
+def test_add_node_update_keeps_label(graph):
+    assert apply_op(graph, {'op': 'add_node', 'node': {'id': 'CS', 'level': 'advanced'}})
+    assert dict(graph.nodes['CS']) == {'label': '计算机科学', 'level': 'advanced'}
+
+
+def test_add_node_new_node_gets_default_label(graph):
+    assert apply_op(graph, {'op': 'add_node', 'node': {'id': 'Machine_Learning'}})
+    assert graph.nodes['Machine_Learning']['label'] == 'Machine Learning'
+
+
+def test_replayed_update_keeps_label(graph, tmp_path):
+    journal = ProjectJournal(str(tmp_path))
+    journal.append([{'op': 'add_node', 'node': {'id': 'CS', 'level': 'advanced'}},
+                    {'op': 'add_node', 'node': {'id': 'CS', 'label': 'Computer_Science'}}])
+    assert journal.replay(graph) == 2
+    assert dict(graph.nodes['CS']) == {'label': 'Computer Science', 'level': 'advanced'}
+
+
+def test_compact_does_not_count_ops_without_effect(tmp_path):
+    (tmp_path / 'graph.yaml').write_text("nodes:\n  - id: A\n  - id: B\nedges: []\n", encoding='utf-8')
+    project = SkillTreeProject(str(tmp_path))
+    project.journal.append([{'op': 'add_edge', 'edge': {'source': 'A', 'target': 'B'}},
+                            {'op': 'add_edge', 'edge': {'source': 'A', 'target': 'Missing'}},
+                            {'op': 'remove_node', 'id': 'Ghost'}])
+    assert project.compact_journal() == (1, 2)
+    assert not project.journal.exists()
+    assert list(project.graph.edges()) == [('A', 'B')]
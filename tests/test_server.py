@@ -0,0 +1,62 @@
+import pytest
+
+from src.core import SkillTreeProject
+from web.server import GraphService
+
+GRAPH_YAML = """\
+nodes:
+  - id: CS
+    label: 计算机科学
+    level: foundational
+  - id: Math
+    level: foundational
+edges:
+  - source: Math
+    target: CS
+    type: DEPENDS_ON
+    strength: 0.5
+"""
+
+
+@pytest.fixture
+def service(tmp_path):
+    (tmp_path / 'graph.yaml').write_text(GRAPH_YAML, encoding='utf-8')
+    service = GraphService(SkillTreeProject(str(tmp_path)), batch_interval=0)
+    assert service.start()
+    yield service
+    service.stop()
+
+
+def test_repeated_writes_do_not_grow_attribute_tables(service):
+    graph = service.snapshot().graph
+    node_rows, edge_rows = graph.node_table.size, graph.edge_table.size
+    for i in range(200):
+        service.submit([
+            {'op': 'add_node', 'node': {'id': 'CS', 'level': f'level {i % 3}'}},
+            {'op': 'add_node', 'node': {'id': 'Math', 'tags': ['a', 'b']}},
+            {'op': 'add_edge', 'edge': {'source': 'Math', 'target': 'CS', 'strength': i / 200}},
+        ])
+    graph = service.snapshot().graph
+    assert graph.node_table.size == node_rows
+    assert graph.edge_table.size == edge_rows
+    assert graph.nodes['CS'] == {'label': '计算机科学', 'level': 'level 1'}
+    assert graph.edges['Math', 'CS']['strength'] == 199 / 200
+
+
+def test_update_via_service_keeps_label(service):
+    service.submit([{'op': 'add_node', 'node': {'id': 'CS', 'level': 'advanced'}}])
+    assert service.snapshot().graph.nodes['CS']['label'] == '计算机科学'
+
+
+def test_ops_without_effect_are_not_journaled(service):
+    journal = service.project.journal
+    version, results = service.submit([{'op': 'remove_node', 'id': 'Ghost'}])
+    assert (version, results) == (0, [False])
+    version, results = service.submit([
+        {'op': 'add_edge', 'edge': {'source': 'CS', 'target': 'Missing'}},
+        {'op': 'remove_node', 'id': 'Ghost'},
+        {'op': 'remove_edge', 'source': 'CS', 'target': 'Math'},
+        {'op': 'add_edge', 'edge': {'source': 'CS', 'target': 'Math'}},
+    ])
+    assert results == [False, False, False, True]
+    assert [op['op'] for op in journal.read_ops()] == ['add_edge']
@@ -0,0 +1,538 @@
+# /web/server.py
+import http.server
+import json
+import queue
+import threading
+import time
+from functools import cached_property, partial
+from urllib.parse import urlparse, parse_qs
+
+import networkx as nx
+
+from src.journal import apply_op, normalize_op
+from src.positions import load_positions, save_positions, parse_posted_positions
+
+DEFAULT_BATCH_INTERVAL = 0.05 # 秒，写批次的最长等待时间
+DEFAULT_MAX_BATCH = 1000      # 每个写批次最多包含的操作数
+DEFAULT_SEARCH_LIMIT = 20
+
+
+class GraphSnapshot:
+    """
+    图的只读快照。读请求在开始时取得当前快照的引用，
+    之后即使有写批次提交，也只会看到这一版本的数据 (快照隔离)。
+    """
+    __slots__ = ('version', 'graph', '_search_index', '_index_lock')
+
+    def __init__(self, version, graph, search_index=None):
+        self.version = version
+        self.graph = graph
+        self._search_index = search_index
+        self._index_lock = threading.Lock()
+
+    @staticmethod
+    def search_entry(node_id, attrs):
+        return str(node_id).lower(), str(attrs.get('label', node_id)).lower()
+
+    def search_index(self):
+        """按需构建的搜索索引：{node_id: (小写 id, 小写 label)}，每个快照只构建一次。"""
+        if self._search_index is None:
+            with self._index_lock:
+                if self._search_index is None:
+                    self._search_index = {node_id: self.search_entry(node_id, attrs)
+                                          for node_id, attrs in self.graph.nodes(data=True)}
+        return self._search_index
+
+    def derive_search_index(self, graph, changed_nodes):
+        """
+        为下一版本的图派生搜索索引：复制本快照已构建的索引，只更新 changed_nodes。
+        本快照尚未构建索引时返回 None (下一版本按需构建)。
+        """
+        index = self._search_index
+        if index is None:
+            return None
+        index = dict(index)
+        for node_id in changed_nodes:
+            if node_id in graph._node:
+                index[node_id] = self.search_entry(node_id, graph._node[node_id])
+            else:
+                index.pop(node_id, None)
+        return index
+
+
+def _structural_copy(graph):
+    """
+    浅复制图的顶层字典 (_node、_succ、_pred)，节点的邻接字典与属性字典仍与原图共享。
+    networkx 以 cached_property 缓存的视图 (nodes、edges 等) 绑定在原图上，不能复制过来。
+    """
+    cls = type(graph)
+    new_graph = cls.__new__(cls)
+    for key, value in graph.__dict__.items():
+        if not isinstance(getattr(cls, key, None), cached_property):
+            new_graph.__dict__[key] = value
+    new_graph.__dict__['__networkx_cache__'] = {}
+    new_graph.graph = dict(graph.graph)
+    new_graph._node = dict(graph._node)
+    new_graph._succ = new_graph._adj = dict(graph._succ)
+    new_graph._pred = dict(graph._pred)
+    return new_graph
+
+
+class _CopyOnWriteGraph:
+    """
+    写批次使用的新版本图。与上一快照共享所有内层字典，
+    只在操作即将修改某个节点的邻接字典、节点属性或边属性之前复制它，
+    每个字典在一个批次内最多复制一次。因此一个批次的开销是复制三个顶层字典
+    (C 层面的 dict 复制) 加上与被修改元素数量成正比的部分，而不是复制整张图。
+    复制出的属性字典一律是普通 dict：CompactDiGraph 的属性工厂每次都会在共享的 ColumnTable 中
+    分配新行，而旧行仍被之前的快照引用、无法回收，常驻的服务会随写入次数无限增长。
+    普通 dict 被替换后随旧快照一起释放，表行数只随新建的元素增长。
+    操作须已经过 normalize_op (id 均为字符串)。
+    """
+    def __init__(self, base_graph):
+        self.graph = _structural_copy(base_graph)
+        self._owned = set()
+        self.changed_nodes = set() # 被添加、修改或删除的节点，用于增量更新搜索索引
+
+    def _own_adjacency(self, table_name, node_id):
+        key = (table_name, node_id)
+        if key in self._owned:
+            return
+        table = getattr(self.graph, table_name)
+        if node_id in table:
+            table[node_id] = dict(table[node_id])
+        self._owned.add(key)
+
+    def _own_node_attrs(self, node_id):
+        key = ('node', node_id)
+        if key in self._owned:
+            return
+        if node_id in self.graph._node:
+            self.graph._node[node_id] = dict(self.graph._node[node_id])
+        self._owned.add(key)
+
+    def _own_edge_attrs(self, source, target):
+        key = ('edge', source, target)
+        if key in self._owned:
+            return
+        self._own_adjacency('_succ', source)
+        self._own_adjacency('_pred', target)
+        succ = self.graph._succ.get(source)
+        if succ is not None and target in succ:
+            attrs = dict(succ[target])
+            succ[target] = attrs
+            self.graph._pred[target][source] = attrs
+        self._owned.add(key)
+
+    def apply(self, op):
+        """复制 op 将要修改的字典，再用 apply_op 应用。:return: 同 apply_op。"""
+        graph = self.graph
+        kind = op['op']
+        if kind == 'add_node':
+            self._own_node_attrs(op['node']['id'])
+            self.changed_nodes.add(op['node']['id'])
+        elif kind == 'add_edge':
+            self._own_edge_attrs(op['edge']['source'], op['edge']['target'])
+        elif kind == 'remove_node':
+            node_id = op['id']
+            self.changed_nodes.add(node_id)
+            if node_id in graph._succ:
+                for target in graph._succ[node_id]:
+                    self._own_adjacency('_pred', target)
+                for source in graph._pred[node_id]:
+                    self._own_adjacency('_succ', source)
+        elif kind == 'remove_edge':
+            self._own_adjacency('_succ', op['source'])
+            self._own_adjacency('_pred', op['target'])
+        return apply_op(graph, op)
+
+
+class _PendingWrite:
+    """一次写请求：提交的操作、完成事件以及结果。"""
+    __slots__ = ('ops', 'done', 'results', 'version', 'error')
+
+    def __init__(self, ops):
+        self.ops = ops
+        self.done = threading.Event()
+        self.results = None
+        self.version = None
+        self.error = None
+
+
+class GraphService:
+    """
+    常驻内存的图服务。
+    - 读：无锁读取当前 GraphSnapshot。
+    - 写：请求进入队列，由单个写线程按批次处理：以写时复制的方式派生新版本的图
+      (见 _CopyOnWriteGraph，只复制被修改的节点/边的字典)、依次应用操作、
+      将整批操作一次性追加到编辑日志 (一次 fsync)，最后原子地替换快照。
+      写请求在其所在批次落盘之后才返回，因此已确认的写入不会丢失。
+    """
+    def __init__(self, project, batch_interval=DEFAULT_BATCH_INTERVAL, max_batch=DEFAULT_MAX_BATCH):
+        self.project = project
+        self.batch_interval = batch_interval
+        self.max_batch = max_batch
+        self._queue = queue.Queue()
+        self._snapshot = None
+        self._writer_thread = None
+        self._stopping = threading.Event()
+
+    def start(self):
+        """加载工程并启动写线程。:return: 加载成功返回 True。"""
+        self.project.load_relations()
+        if self.project.graph is None:
+            return False
+        self._snapshot = GraphSnapshot(0, self.project.graph)
+        self._writer_thread = threading.Thread(target=self._writer_loop, name="graph-writer", daemon=True)
+        self._writer_thread.start()
+        return True
+
+    def stop(self):
+        """停止写线程；队列中已提交的写入会先处理完。"""
+        self._stopping.set()
+        self._queue.put(None)
+        if self._writer_thread:
+            self._writer_thread.join()
+
+    def snapshot(self):
+        return self._snapshot
+
+    def submit(self, ops, timeout=None):
+        """
+        提交一组操作 (编辑日志格式) 并等待其所在批次提交。
+        操作在提交前按编辑日志的规则校验 (normalize_op)，不合法的请求不会进入写队列。
+        :return: (版本号, 每个操作是否生效的列表)。
+        :raises ValueError: 操作不合法，或应用时出错 (此时该请求中此前的操作已生效，其后的操作不再应用)。
+        :raises RuntimeError: 写入日志失败或服务已停止时。
+        """
+        ops = [normalize_op(op) for op in ops]
+        if self._stopping.is_set():
+            raise RuntimeError("服务正在停止，不再接受写入")
+        pending = _PendingWrite(ops)
+        self._queue.put(pending)
+        if not pending.done.wait(timeout):
+            raise RuntimeError("等待写入提交超时")
+        if pending.error is not None:
+            raise pending.error
+        return pending.version, pending.results
+
+    def _collect_batch(self, first):
+        """以 first 为首，在 batch_interval 时间内收集更多写请求，直到达到 max_batch。"""
+        batch = [first]
+        op_count = len(first.ops)
+        deadline = time.monotonic() + self.batch_interval
+        while op_count < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None: # 停止信号，处理完当前批次后退出
+                self._queue.put(None)
+                break
+            batch.append(item)
+            op_count += len(item.ops)
+        return batch
+
+    def _writer_loop(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                if self._stopping.is_set() and self._queue.empty():
+                    return
+                continue
+            batch = self._collect_batch(first)
+            self._commit_batch(batch)
+
+    def _commit_batch(self, batch):
+        current = self._snapshot
+        cow = _CopyOnWriteGraph(current.graph)
+        new_graph = cow.graph
+        applied_ops = []
+        for pending in batch:
+            # 每个操作单独捕获异常：出错只影响其所属的请求，同批次的其他请求照常提交
+            pending.results = []
+            for op in pending.ops:
+                try:
+                    applied = cow.apply(op)
+                except Exception as e:
+                    pending.error = ValueError(f"操作 {op!r} 无法应用: {e}")
+                    break
+                pending.results.append(applied)
+                # 未生效的操作 (端点不存在的边、删除不存在的元素) 不写入日志
+                if applied:
+                    applied_ops.append(op)
+        try:
+            if applied_ops:
+                self.project.journal.append(applied_ops)
+        except Exception as e:
+            # 整批放弃：快照保持不变，日志要么完整写入要么没有写入
+            for pending in batch:
+                pending.error = RuntimeError(f"提交写批次失败: {e}")
+                pending.done.set()
+            return
+        if applied_ops: # 整批都未生效时图没有变化，不发布新版本
+            self._snapshot = GraphSnapshot(current.version + 1, new_graph,
+                                           current.derive_search_index(new_graph, cow.changed_nodes))
+            self.project.graph = new_graph
+        for pending in batch:
+            pending.version = self._snapshot.version
+            pending.done.set()
+
+    # --- 只读查询，均作用于调用方传入的快照 ---
+
+    @staticmethod
+    def node_payload(graph, node_id):
+        return {'id': node_id, **dict(graph.nodes[node_id])}
+
+    def neighbors(self, snap, node_id, direction='out'):
+        graph = snap.graph
+        result = {}
+        if direction in ('out', 'both'):
+            result['successors'] = [
+                {'id': v, **dict(graph.edges[node_id, v])} for v in graph.successors(node_id)]
+        if direction in ('in', 'both'):
+            result['predecessors'] = [
+                {'id': u, **dict(graph.edges[u, node_id])} for u in graph.predecessors(node_id)]
+        return result
+
+    def search(self, snap, text, limit=DEFAULT_SEARCH_LIMIT):
+        text = text.lower()
+        matches = []
+        for node_id, (id_lower, label_lower) in snap.search_index().items():
+            if text in id_lower or text in label_lower:
+                matches.append(self.node_payload(snap.graph, node_id))
+                if len(matches) >= limit:
+                    break
+        return matches
+
+    def shortest_path(self, snap, source, target, undirected=False):
+        graph = snap.graph.to_undirected(as_view=True) if undirected else snap.graph
+        return nx.shortest_path(graph, source, target)
+
+
+class ProjectFileRequestHandler(http.server.SimpleHTTPRequestHandler):
+    """
+    工程目录的静态文件服务 (open 启动的本地服务器使用)，外加页面回传节点坐标的接口：
+
+    GET  /api/positions
+    POST /api/positions  {"positions": {id: {"x": ..., "y": ...}}}  (vis.js getPositions() 的格式)
+    """
+    def __init__(self, *args, positions_file=None, **kwargs):
+        self.positions_file = positions_file
+        super().__init__(*args, **kwargs)
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False, default=str).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json_body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        if length <= 0:
+            return None
+        return json.loads(self.rfile.read(length).decode('utf-8'))
+
+    def _reject_cross_site_write(self, method):
+        """
+        拒绝可能来自其它网页的写请求。浏览器跨站发出的“简单请求” (例如 text/plain 的 POST) 不经过预检，
+        因此 POST 必须是 application/json；带 Origin 头的请求还要求其与 Host 一致。
+        :return: 应拒绝时返回 (状态码, 响应体)，否则返回 None。
+        """
+        origin = self.headers.get('Origin')
+        if origin is not None and urlparse(origin).netloc != self.headers.get('Host'):
+            return 403, {'error': f"cross-origin request from '{origin}' rejected"}
+        if method == 'POST':
+            content_type = (self.headers.get('Content-Type') or '').split(';', 1)[0].strip().lower()
+            if content_type != 'application/json':
+                return 415, {'error': "Content-Type must be application/json"}
+        return None
+
+    def _send_rejection(self, rejection):
+        # 请求体未读取，不能继续复用该连接
+        self.close_connection = True
+        self._send_json(*rejection)
+
+    def _handle_positions(self, method):
+        """:return: (状态码, 响应体)。:raises ValueError: 请求体不合法时。"""
+        if self.positions_file is None:
+            return 404, {'error': 'positions are not available for this project'}
+        if method == 'GET':
+            positions = load_positions(self.positions_file)
+            return 200, {'positions': {node_id: {'x': x, 'y': y} for node_id, (x, y) in positions.items()}}
+        if method == 'POST':
+            positions = parse_posted_positions(self._read_json_body())
+            save_positions(self.positions_file, positions)
+            return 200, {'saved': len(positions)}
+        return 405, {'error': f"method {method} not allowed"}
+
+    def do_GET(self):
+        if urlparse(self.path).path.rstrip('/') != '/api/positions':
+            super().do_GET()
+            return
+        self._send_json(*self._handle_positions('GET'))
+
+    def do_POST(self):
+        if urlparse(self.path).path.rstrip('/') != '/api/positions':
+            self._send_json(404, {'error': 'not found'})
+            return
+        rejection = self._reject_cross_site_write('POST')
+        if rejection is not None:
+            self._send_rejection(rejection)
+            return
+        try:
+            status, payload = self._handle_positions('POST')
+        except (ValueError, json.JSONDecodeError) as e:
+            status, payload = 400, {'error': str(e)}
+        except OSError as e:
+            status, payload = 500, {'error': str(e)}
+        self._send_json(status, payload)
+
+
+class GraphRequestHandler(ProjectFileRequestHandler):
+    """
+    JSON API 处理器；/api/ 以外的路径按静态文件处理 (工程目录，例如 skill_tree.html)。
+
+    GET    /api/info
+    GET    /api/node?id=X
+    GET    /api/neighbors?id=X&direction=out|in|both
+    GET    /api/search?q=TEXT&limit=N
+    GET    /api/path?source=A&target=B&undirected=1
+    GET    /api/positions
+    POST   /api/positions  页面回传的节点坐标，保存为 positions.json
+    POST   /api/ops        {"ops": [编辑日志格式的操作, ...]}，applied 中为 false 的操作未生效，也不写入日志
+    POST   /api/nodes      节点记录 (同 graph.yaml)
+    POST   /api/edges      边记录 (同 graph.yaml)
+    DELETE /api/nodes?id=X
+    DELETE /api/edges?source=A&target=B
+    (nodes / edges 接口的操作未生效时返回 404：删除的元素不存在，或新边的端点不存在)
+
+    POST 请求体须为 application/json；跨站 (Origin 与 Host 不一致) 的 POST / DELETE 一律拒绝。
+    """
+    protocol_version = "HTTP/1.1"
+    # 长连接下响应头与响应体分两次写出，关闭 Nagle 算法以免与延迟 ACK 叠加产生约 40ms 的延迟
+    disable_nagle_algorithm = True
+
+    def __init__(self, *args, service=None, verbose=False, **kwargs):
+        self.service = service
+        self.verbose = verbose
+        super().__init__(*args, **kwargs)
+
+    def log_message(self, format, *args):
+        if self.verbose:
+            super().log_message(format, *args)
+
+    def _dispatch(self, method):
+        parsed = urlparse(self.path)
+        if not parsed.path.startswith('/api/'):
+            return False
+        if method in ('POST', 'DELETE'):
+            rejection = self._reject_cross_site_write(method)
+            if rejection is not None:
+                self._send_rejection(rejection)
+                return True
+        params = {k: v[-1] for k, v in parse_qs(parsed.query, keep_blank_values=True).items()}
+        try:
+            status, payload = self._handle_api(method, parsed.path[len('/api/'):].rstrip('/'), params)
+        except (ValueError, KeyError, json.JSONDecodeError) as e:
+            status, payload = 400, {'error': str(e)}
+        except nx.NetworkXNoPath as e:
+            status, payload = 404, {'error': str(e)}
+        except nx.NodeNotFound as e:
+            status, payload = 404, {'error': str(e)}
+        except RuntimeError as e:
+            status, payload = 503, {'error': str(e)}
+        except OSError as e:
+            status, payload = 500, {'error': str(e)}
+        self._send_json(status, payload)
+        return True
+
+    def _handle_api(self, method, endpoint, params):
+        service = self.service
+        if endpoint == 'positions':
+            return self._handle_positions(method)
+        if method == 'GET':
+            snap = service.snapshot()
+            graph = snap.graph
+            if endpoint == 'info':
+                return 200, {'project': service.project.project_path, 'version': snap.version,
+                             'nodes': graph.number_of_nodes(), 'edges': graph.number_of_edges()}
+            if endpoint == 'node':
+                node_id = params['id']
+                if node_id not in graph:
+                    return 404, {'error': f"node '{node_id}' not found"}
+                return 200, {'version': snap.version, 'node': service.node_payload(graph, node_id)}
+            if endpoint == 'neighbors':
+                node_id = params['id']
+                if node_id not in graph:
+                    return 404, {'error': f"node '{node_id}' not found"}
+                direction = params.get('direction', 'out')
+                if direction not in ('out', 'in', 'both'):
+                    raise ValueError("direction must be out, in or both")
+                return 200, {'version': snap.version, 'id': node_id, **service.neighbors(snap, node_id, direction)}
+            if endpoint == 'search':
+                limit = int(params.get('limit', DEFAULT_SEARCH_LIMIT))
+                return 200, {'version': snap.version, 'results': service.search(snap, params['q'], limit)}
+            if endpoint == 'path':
+                undirected = params.get('undirected', '0').lower() in ('1', 'true', 'yes')
+                path = service.shortest_path(snap, params['source'], params['target'], undirected)
+                return 200, {'version': snap.version, 'path': path}
+            return 404, {'error': f"unknown endpoint '{endpoint}'"}
+
+        if method == 'POST':
+            body = self._read_json_body()
+            if endpoint == 'ops':
+                if not isinstance(body, dict) or not isinstance(body.get('ops'), list):
+                    raise ValueError("request body must be {\"ops\": [...]}")
+                ops = body['ops']
+            elif endpoint == 'nodes':
+                ops = [{'op': 'add_node', 'node': body}]
+            elif endpoint == 'edges':
+                ops = [{'op': 'add_edge', 'edge': body}]
+            else:
+                return 404, {'error': f"unknown endpoint '{endpoint}'"}
+        elif method == 'DELETE':
+            if endpoint == 'nodes':
+                ops = [{'op': 'remove_node', 'id': params['id']}]
+            elif endpoint == 'edges':
+                ops = [{'op': 'remove_edge', 'source': params['source'], 'target': params['target']}]
+            else:
+                return 404, {'error': f"unknown endpoint '{endpoint}'"}
+        else:
+            return 405, {'error': f"method {method} not allowed"}
+
+        version, results = service.submit(ops)
+        if endpoint != 'ops' and not results[0]:
+            # 单个操作的接口：未生效即视为目标不存在 (删除不存在的元素，或边的端点不存在)
+            return 404, {'version': version, 'applied': results, 'error': "node or edge not found"}
+        return 200, {'version': version, 'applied': results}
+
+    def do_GET(self):
+        if not self._dispatch('GET'):
+            super().do_GET()
+
+    def do_POST(self):
+        if not self._dispatch('POST'):
+            self._send_json(404, {'error': 'not found'})
+
+    def do_DELETE(self):
+        if not self._dispatch('DELETE'):
+            self._send_json(404, {'error': 'not found'})
+
+
+class GraphHTTPServer(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+def create_server(service, host, port, verbose=False):
+    """创建绑定到 service 的多线程 HTTP 服务器 (尚未开始 serve_forever)。"""
+    handler = partial(GraphRequestHandler, service=service, verbose=verbose,
+                      directory=str(service.project.project_path),
+                      positions_file=service.project.positions_file)
+    return GraphHTTPServer((host, port), handler)